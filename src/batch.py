@@ -0,0 +1,136 @@
+import io
+import os
+import json
+import time
+import traceback
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr
+from typing import List, Dict, Optional, TextIO, Union
+
+from interpreter_objects import DEFAULT_MAX_STACK_DEPTH
+from errors import ErrorCodes, InterpreterError, handle_error, report_error
+from helpers import InputFile
+from program import Program
+
+# Manifest is JSON Lines file, every line describes one case (paths are relative to directory of manifest):
+#   {"source": "<XML source or bytecode>", "input": "<input file>", "expected": "<file with expected output>", "expected_exit_code": 0}
+# Only source is required. Every case produces one line of report in order of manifest:
+#   {"case": 0, "source": "...", "input": "...", "exit_code": 0, "output_match": true, "exit_code_match": true, "time": 0.001, "stderr": ""}
+# Matches are null when case doesn't have expected value, time is duration of the run in seconds (without loading of program)
+
+# Programs already loaded by worker process, failed loads are kept as error which is reported by every case of program
+loaded_programs:Dict[str, Union[Program, InterpreterError]] = {}
+
+def get_program(source:str) -> Program:
+  if source not in loaded_programs:
+    try:
+      if not os.path.isfile(source):
+        handle_error(ErrorCodes.INPUT_FILE, f"Failed to locate input source file '{source}'")
+      loaded_programs[source] = Program.load(source)
+    except InterpreterError as error:
+      loaded_programs[source] = error
+
+  program = loaded_programs[source]
+  if isinstance(program, InterpreterError):
+    raise program
+  return program
+
+def read_text_file(path:str) -> str:
+  with open(path, "r", encoding="utf-8") as f:
+    return f.read()
+
+def load_manifest(manifest_path:str) -> List[Dict]:
+  base_directory = os.path.dirname(os.path.abspath(manifest_path))
+
+  cases = []
+  try:
+    with open(manifest_path, "r", encoding="utf-8") as f:
+      for line in f:
+        if not line.strip():
+          continue
+
+        case = json.loads(line)
+        if not isinstance(case, dict) or "source" not in case:
+          handle_error(ErrorCodes.INPUT_FILE, f"Case without source in batch manifest '{manifest_path}'")
+
+        for key in ("source", "input", "expected"):
+          if case.get(key) is None and key != "source":
+            continue
+
+          if not isinstance(case[key], str):
+            handle_error(ErrorCodes.INPUT_FILE, f"Path '{key}' of case in batch manifest '{manifest_path}' is not string")
+          case[key] = os.path.join(base_directory, case[key])
+        cases.append(case)
+  except OSError:
+    handle_error(ErrorCodes.INPUT_FILE, f"Failed to open batch manifest '{manifest_path}'")
+  except ValueError:
+    handle_error(ErrorCodes.INPUT_FILE, f"Bad format of batch manifest '{manifest_path}'")
+
+  return cases
+
+# Run one case in worker process, any failure of case is reported in its result so it doesn't stop the whole batch
+def run_case(case_index:int, case:Dict, max_stack_depth:int=DEFAULT_MAX_STACK_DEPTH) -> Dict:
+  source = case["source"]
+  input_path = case.get("input")
+
+  stdout = io.StringIO()
+  stderr = io.StringIO()
+
+  # Program is loaded only by first case of its source, so loading isn't part of measured time
+  run_time = 0.0
+  with redirect_stderr(stderr):
+    try:
+      program = get_program(source)
+      if not program.instructions:
+        exit_code = 0
+      else:
+        input_file = InputFile(input_path) if input_path is not None else InputFile.from_text(None)
+        start_time = time.perf_counter()
+        try:
+          exit_code = program.run(input_file, stdout, max_stack_depth=max_stack_depth)
+        finally:
+          run_time = time.perf_counter() - start_time
+    except InterpreterError as error:
+      exit_code = report_error(error)
+    except Exception:
+      traceback.print_exc()
+      exit_code = ErrorCodes.INTERN.value
+
+  output_match:Optional[bool] = None
+  if case.get("expected") is not None:
+    try:
+      output_match = stdout.getvalue() == read_text_file(case["expected"])
+    except (OSError, ValueError):
+      # Missing or not UTF-8 expected output never matches
+      output_match = False
+
+  exit_code_match:Optional[bool] = None
+  if case.get("expected_exit_code") is not None:
+    exit_code_match = exit_code == case["expected_exit_code"]
+
+  return {
+    "case": case_index,
+    "source": source,
+    "input": input_path,
+    "exit_code": exit_code,
+    "output_match": output_match,
+    "exit_code_match": exit_code_match,
+    "time": run_time,
+    "stderr": stderr.getvalue()
+  }
+
+# Run all cases of manifest in pool of processes (one per core by default) and write report to stream
+def run_batch(manifest_path:str, report_stream:TextIO, max_workers:Optional[int]=None, max_stack_depth:int=DEFAULT_MAX_STACK_DEPTH):
+  cases = load_manifest(manifest_path)
+  if not cases:
+    return
+
+  max_workers = max_workers or os.cpu_count() or 1
+  # Chunks keep cases close in manifest (usually same program) in one worker
+  chunk_size = max(1, len(cases) // (max_workers * 4))
+
+  with ProcessPoolExecutor(max_workers=max_workers) as executor:
+    for result in executor.map(partial(run_case, max_stack_depth=max_stack_depth), range(len(cases)), cases, chunksize=chunk_size):
+      report_stream.write(json.dumps(result) + "\n")
+  report_stream.flush()
@@ -0,0 +1,94 @@
+import os
+import sys
+import marshal
+import hashlib
+import tempfile
+from typing import List, Optional, Union
+
+from errors import XMLStructureError
+from interpreter_objects import Instruction, InstructionKey, Argument, ArgumentTypeKey, FrameTypeKey
+
+# Bytecode file is header (magic + format version) followed by marshaled tuple of sorted instructions
+BYTECODE_MAGIC = b"IPPC22BC"
+BYTECODE_VERSION = 2
+BYTECODE_HEADER = BYTECODE_MAGIC + BYTECODE_VERSION.to_bytes(2, "little")
+BYTECODE_EXTENSION = ".ippc"
+
+def is_bytecode_file(path:str) -> bool:
+  try:
+    with open(path, "rb") as f:
+      return f.read(len(BYTECODE_MAGIC)) == BYTECODE_MAGIC
+  except OSError:
+    return False
+
+# Convert argument value to marshalable representation
+def encode_argument_value(argument:Argument):
+  if argument.type == ArgumentTypeKey.VAR:
+    frame_type, label = argument.value
+    return frame_type.name, label
+  elif argument.type == ArgumentTypeKey.TYPE:
+    return argument.value.name
+  return argument.value
+
+def decode_argument_value(argument_type:ArgumentTypeKey, value):
+  if argument_type == ArgumentTypeKey.VAR:
+    return FrameTypeKey[value[0]], value[1]
+  elif argument_type == ArgumentTypeKey.TYPE:
+    return ArgumentTypeKey[value]
+  elif argument_type == ArgumentTypeKey.STRING:
+    # Identical literals share one object like in program loaded from XML
+    return sys.intern(value)
+  return value
+
+def save_bytecode(instructions:List[Instruction], path:str):
+  data = tuple((instruction.instruction.name, instruction.order,
+                tuple((argument.type.name, encode_argument_value(argument), argument.idx) for argument in instruction.arguments))
+               for instruction in instructions)
+
+  # Write to temporary file first so other processes never see partially written bytecode
+  directory = os.path.dirname(os.path.abspath(path))
+  file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=BYTECODE_EXTENSION)
+  try:
+    os.chmod(temporary_path, 0o644)
+    with os.fdopen(file_descriptor, "wb") as f:
+      f.write(BYTECODE_HEADER)
+      f.write(marshal.dumps(data))
+    os.replace(temporary_path, path)
+  except:
+    if os.path.exists(temporary_path):
+      os.remove(temporary_path)
+    raise
+
+# Load instructions from bytecode file, returns None when file is not valid bytecode of current version
+def load_bytecode(path:str) -> Optional[List[Instruction]]:
+  try:
+    with open(path, "rb") as f:
+      if f.read(len(BYTECODE_HEADER)) != BYTECODE_HEADER:
+        return None
+      data = marshal.load(f)
+
+    instructions = []
+    for instruction_name, order, arguments in data:
+      instruction = Instruction(InstructionKey[instruction_name], order,
+                                [Argument.from_value(ArgumentTypeKey[argument_type], decode_argument_value(ArgumentTypeKey[argument_type], value), idx)
+                                 for argument_type, value, idx in arguments])
+      # Compiled instructions rely on their schema, bytecode file can be modified or written by other tool
+      instruction.check_arguments()
+      instructions.append(instruction)
+    return instructions
+  except (OSError, EOFError, ValueError, TypeError, KeyError, IndexError, XMLStructureError):
+    return None
+
+# Hash of source data used as key to bytecode cache
+def get_source_hash(source:Union[str, bytes]) -> str:
+  source_hash = hashlib.sha256()
+  if isinstance(source, bytes):
+    source_hash.update(source)
+  else:
+    with open(source, "rb") as f:
+      for chunk in iter(lambda: f.read(1 << 20), b""):
+        source_hash.update(chunk)
+  return source_hash.hexdigest()
+
+def get_cache_path(cache_dir:str, source_hash:str) -> str:
+  return os.path.join(cache_dir, source_hash + BYTECODE_EXTENSION)
@@ -0,0 +1,610 @@
+import sys
+from typing import List, Dict, Callable, Tuple, Any
+
+from interpreter_objects import Instruction, InstructionKey, Argument, Frame, FrameTypeKey, ArgumentTypeKey, ArgumentTypeToVariableType, VariableTypeKey, UNDEFINED_VARIABLE, \
+  STRING_BUFFER, SUPERINSTRUCTION_COMPARISONS
+from errors import ErrorCodes, handle_error
+from execution import ExecutionState, ProgramExit
+from operations import perform_binary_operation, get_binary_operation_kernels, perform_unary_operation, check_setchar_operands, handle_read_operation, stack_binary_operation, stack_unary_operation
+
+# Compiled instruction gets execution state and index of next instruction in program and returns index of instruction that should be executed next
+# Number and types of arguments of compiled instructions were already checked by INSTRUCTION_SCHEMAS when program was loaded
+CompiledInstruction = Callable[[ExecutionState, int], int]
+SymbolGetter = Callable[[ExecutionState], Tuple[VariableTypeKey, Any]]
+VariableSetter = Callable[[ExecutionState, VariableTypeKey, Any], None]
+
+# Create function returning type and value of symbol argument (variable or constant)
+# String buffer of variable is returned as it is only to instructions which use just its length and characters
+def compile_symbol_getter(instruction:Instruction, argument:Argument, allow_uninitialized:bool=False, allow_string_buffer:bool=False) -> SymbolGetter:
+  if argument.type != ArgumentTypeKey.VAR:
+    constant = (ArgumentTypeToVariableType[argument.type], argument.value)
+    return lambda state: constant
+
+  frame_type, _ = argument.value
+  slot = argument.slot
+  uninitialized_message = f"Argument of {instruction.instruction} is uninitialized variable"
+  # Variables with these types are handled by frame, plain values are returned directly
+  special_types = (UNDEFINED_VARIABLE, STRING_BUFFER) if allow_uninitialized else (UNDEFINED_VARIABLE, None, STRING_BUFFER)
+
+  if frame_type == FrameTypeKey.GLOBAL:
+    def getter(state:ExecutionState):
+      frame = state.global_frame
+      value_type = frame.variable_types[slot]
+      if value_type in special_types:
+        return frame.read_special_variable(slot, uninitialized_message, allow_string_buffer)
+      return value_type, frame.variable_values[slot]
+  elif frame_type == FrameTypeKey.LOCAL:
+    def getter(state:ExecutionState):
+      if not state.local_frame_stack:
+        handle_error(ErrorCodes.FRAME_DONT_EXIST, "Local frame doesn't exist")
+      frame = state.local_frame_stack[-1]
+      value_type = frame.variable_types[slot]
+      if value_type in special_types:
+        return frame.read_special_variable(slot, uninitialized_message, allow_string_buffer)
+      return value_type, frame.variable_values[slot]
+  elif frame_type == FrameTypeKey.TEMPORARY:
+    def getter(state:ExecutionState):
+      frame = state.temporary_frame
+      if frame is None:
+        handle_error(ErrorCodes.FRAME_DONT_EXIST, "Temporary frame doesn't exist")
+      value_type = frame.variable_types[slot]
+      if value_type in special_types:
+        return frame.read_special_variable(slot, uninitialized_message, allow_string_buffer)
+      return value_type, frame.variable_values[slot]
+
+  return getter
+
+# Create function returning frame of variable argument
+def compile_frame_getter(instruction:Instruction, argument:Argument) -> Callable[[ExecutionState], Frame]:
+  frame_type, _ = argument.value
+
+  if frame_type == FrameTypeKey.GLOBAL:
+    def get_frame(state:ExecutionState):
+      return state.global_frame
+  elif frame_type == FrameTypeKey.LOCAL:
+    def get_frame(state:ExecutionState):
+      if not state.local_frame_stack:
+        handle_error(ErrorCodes.FRAME_DONT_EXIST, "Local frame doesn't exist")
+      return state.local_frame_stack[-1]
+  elif frame_type == FrameTypeKey.TEMPORARY:
+    def get_frame(state:ExecutionState):
+      if state.temporary_frame is None:
+        handle_error(ErrorCodes.FRAME_DONT_EXIST, "Temporary frame doesn't exist")
+      return state.temporary_frame
+
+  return get_frame
+
+# Create function setting value of variable argument
+def compile_variable_setter(instruction:Instruction, argument:Argument) -> VariableSetter:
+  frame_type, _ = argument.value
+  slot = argument.slot
+
+  if frame_type == FrameTypeKey.GLOBAL:
+    def setter(state:ExecutionState, value_type:VariableTypeKey, value):
+      state.global_frame.set_value(slot, value_type, value)
+  elif frame_type == FrameTypeKey.LOCAL:
+    def setter(state:ExecutionState, value_type:VariableTypeKey, value):
+      if not state.local_frame_stack:
+        handle_error(ErrorCodes.FRAME_DONT_EXIST, "Local frame doesn't exist")
+      state.local_frame_stack[-1].set_value(slot, value_type, value)
+  elif frame_type == FrameTypeKey.TEMPORARY:
+    def setter(state:ExecutionState, value_type:VariableTypeKey, value):
+      if state.temporary_frame is None:
+        handle_error(ErrorCodes.FRAME_DONT_EXIST, "Temporary frame doesn't exist")
+      state.temporary_frame.set_value(slot, value_type, value)
+
+  return setter
+
+# Convert value to string representation used by WRITE and DPRINT
+def value_to_string(value_type:VariableTypeKey, value) -> str:
+  if value_type == VariableTypeKey.NIL:
+    return ""
+  elif value_type == VariableTypeKey.BOOL:
+    return "true" if value else "false"
+  return str(value)
+
+################################## LABEL ###########################################
+# Labels are handled before execution
+def compile_label(instruction:Instruction) -> CompiledInstruction:
+  def execute(state:ExecutionState, next_index:int):
+    return next_index
+
+  return execute
+
+################################## CREATE FRAME ####################################
+def compile_createframe(instruction:Instruction) -> CompiledInstruction:
+  def execute(state:ExecutionState, next_index:int):
+    if state.temporary_frame is not None:
+      state.temporary_frame.release()
+    state.temporary_frame = Frame(FrameTypeKey.TEMPORARY, state.local_variable_names, state.variable_counter)
+    return next_index
+
+  return execute
+
+################################### PUSH FRAME #####################################
+def compile_pushframe(instruction:Instruction) -> CompiledInstruction:
+  def execute(state:ExecutionState, next_index:int):
+    if state.temporary_frame is None:
+      handle_error(ErrorCodes.FRAME_DONT_EXIST, "Temporary frame doesn't exist and can't be pushed")
+
+    state.temporary_frame.type = FrameTypeKey.LOCAL
+    state.local_frame_stack.append(state.temporary_frame)
+    state.temporary_frame = None
+    return next_index
+
+  return execute
+
+#################################### POP FRAME #####################################
+def compile_popframe(instruction:Instruction) -> CompiledInstruction:
+  def execute(state:ExecutionState, next_index:int):
+    if not state.local_frame_stack:
+      handle_error(ErrorCodes.FRAME_DONT_EXIST, "Can't pop frames from epty frame stack")
+
+    # Previous temporary frame is overwritten
+    if state.temporary_frame is not None:
+      state.temporary_frame.release()
+    state.temporary_frame = state.local_frame_stack.pop()
+    state.temporary_frame.type = FrameTypeKey.TEMPORARY
+    return next_index
+
+  return execute
+
+##################################### DEFVAR #######################################
+def compile_defvar(instruction:Instruction) -> CompiledInstruction:
+  argument = instruction.arguments[0]
+
+  frame_type, _ = argument.value
+  slot = argument.slot
+
+  if frame_type == FrameTypeKey.GLOBAL:
+    def execute(state:ExecutionState, next_index:int):
+      state.global_frame.create_variable(slot)
+      return next_index
+  elif frame_type == FrameTypeKey.LOCAL:
+    def execute(state:ExecutionState, next_index:int):
+      if not state.local_frame_stack:
+        handle_error(ErrorCodes.FRAME_DONT_EXIST, "Local frame doesn't exist")
+      state.local_frame_stack[-1].create_variable(slot)
+      return next_index
+  elif frame_type == FrameTypeKey.TEMPORARY:
+    def execute(state:ExecutionState, next_index:int):
+      if state.temporary_frame is None:
+        handle_error(ErrorCodes.FRAME_DONT_EXIST, "Temporary frame doesn't exist")
+      state.temporary_frame.create_variable(slot)
+      return next_index
+
+  return execute
+
+###################################### MOVE ########################################
+def compile_move(instruction:Instruction) -> CompiledInstruction:
+  set_destination = compile_variable_setter(instruction, instruction.arguments[0])
+  get_source = compile_symbol_getter(instruction, instruction.arguments[1])
+
+  def execute(state:ExecutionState, next_index:int):
+    set_destination(state, *get_source(state))
+    return next_index
+
+  return execute
+
+###################################### CALL ########################################
+def compile_call(instruction:Instruction) -> CompiledInstruction:
+  target_index = instruction.arguments[0].target_index
+
+  def execute(state:ExecutionState, next_index:int):
+    if len(state.call_stack) >= state.max_stack_depth:
+      handle_error(ErrorCodes.INTERN, f"Call stack exceeded maximum depth {state.max_stack_depth}")
+
+    state.call_stack.append(next_index)
+    return target_index
+
+  return execute
+
+##################################### RETURN #######################################
+def compile_return(instruction:Instruction) -> CompiledInstruction:
+  def execute(state:ExecutionState, next_index:int):
+    if not state.call_stack:
+      handle_error(ErrorCodes.MISSING_VALUE, "Called RETURN on empty callstack")
+
+    return state.call_stack.pop()
+
+  return execute
+
+###################################### PUSHS #######################################
+def compile_pushs(instruction:Instruction) -> CompiledInstruction:
+  get_source = compile_symbol_getter(instruction, instruction.arguments[0])
+
+  def execute(state:ExecutionState, next_index:int):
+    value_type, value = get_source(state)
+    data_stack = state.data_stack
+    if len(data_stack.types) >= data_stack.max_depth:
+      data_stack.report_overflow()
+
+    data_stack.types.append(value_type)
+    data_stack.values.append(value)
+    return next_index
+
+  return execute
+
+###################################### POPS ########################################
+def compile_pops(instruction:Instruction) -> CompiledInstruction:
+  set_destination = compile_variable_setter(instruction, instruction.arguments[0])
+
+  def execute(state:ExecutionState, next_index:int):
+    data_stack = state.data_stack
+    if not data_stack.types:
+      handle_error(ErrorCodes.MISSING_VALUE, "Called POPS on empty data stack")
+
+    set_destination(state, data_stack.types.pop(), data_stack.values.pop())
+    return next_index
+
+  return execute
+
+################################### Binary ops #####################################
+# Operations which only read characters of string in first operand
+CHARACTER_OPERATIONS = (InstructionKey.GETCHAR, InstructionKey.STRI2INT)
+
+def compile_binary_operation(instruction:Instruction) -> CompiledInstruction:
+  operation = instruction.instruction
+  set_destination = compile_variable_setter(instruction, instruction.arguments[0])
+  get_operand1 = compile_symbol_getter(instruction, instruction.arguments[1], allow_string_buffer=operation in CHARACTER_OPERATIONS)
+  get_operand2 = compile_symbol_getter(instruction, instruction.arguments[2])
+  kernels = get_binary_operation_kernels(operation)
+
+  def execute(state:ExecutionState, next_index:int):
+    src_val_type1, src_val1 = get_operand1(state)
+    src_val_type2, src_val2 = get_operand2(state)
+
+    kernel = kernels.get((src_val_type1, src_val_type2))
+    if kernel is None:
+      # Invalid combination of operand types is reported by generic implementation
+      set_destination(state, *perform_binary_operation(operation, src_val1, src_val_type1, src_val2, src_val_type2))
+    else:
+      set_destination(state, *kernel(src_val1, src_val2))
+    return next_index
+
+  return execute
+
+###################################### CONCAT ######################################
+def compile_concat(instruction:Instruction) -> CompiledInstruction:
+  destination, operand1, _ = instruction.arguments
+  # Only appending to destination variable itself (CONCAT x x y) can be done in place
+  if operand1.type != ArgumentTypeKey.VAR or destination.value != operand1.value:
+    return compile_binary_operation(instruction)
+
+  compute_result = compile_binary_operation(instruction)
+  get_frame = compile_frame_getter(instruction, destination)
+  get_operand2 = compile_symbol_getter(instruction, instruction.arguments[2])
+  slot = destination.slot
+
+  def execute(state:ExecutionState, next_index:int):
+    frame = get_frame(state)
+    if frame.variable_types[slot] not in (VariableTypeKey.STRING, STRING_BUFFER):
+      # Errors of operands are reported by generic implementation
+      return compute_result(state, next_index)
+
+    src_val_type2, src_val2 = get_operand2(state)
+    if src_val_type2 != VariableTypeKey.STRING:
+      return compute_result(state, next_index)
+
+    frame.get_string_buffer(slot).append(src_val2)
+    return next_index
+
+  return execute
+
+##################################### SETCHAR ######################################
+def compile_setchar(instruction:Instruction) -> CompiledInstruction:
+  get_frame = compile_frame_getter(instruction, instruction.arguments[0])
+  get_input = compile_symbol_getter(instruction, instruction.arguments[0], allow_string_buffer=True)
+  get_operand1 = compile_symbol_getter(instruction, instruction.arguments[1])
+  get_operand2 = compile_symbol_getter(instruction, instruction.arguments[2])
+  slot = instruction.arguments[0].slot
+
+  def execute(state:ExecutionState, next_index:int):
+    src_val_type1, src_val1 = get_operand1(state)
+    src_val_type2, src_val2 = get_operand2(state)
+    input_value_type, input_value = get_input(state)
+    check_setchar_operands(input_value, input_value_type, src_val1, src_val_type1, src_val2, src_val_type2)
+
+    # Character is replaced in place, string is converted to buffer by first SETCHAR
+    get_frame(state).get_string_buffer(slot).set_character(src_val1, src_val2[0])
+    return next_index
+
+  return execute
+
+################################### Unary ops ######################################
+def compile_unary_operation(instruction:Instruction) -> CompiledInstruction:
+  operation = instruction.instruction
+  set_destination = compile_variable_setter(instruction, instruction.arguments[0])
+  # TYPE is only operation that can work with uninitialized variables, STRLEN only needs length of string buffer
+  get_operand = compile_symbol_getter(instruction, instruction.arguments[1], allow_uninitialized=operation == InstructionKey.TYPE,
+                                      allow_string_buffer=operation == InstructionKey.STRLEN)
+
+  def execute(state:ExecutionState, next_index:int):
+    src_val_type, src_val = get_operand(state)
+    set_destination(state, *perform_unary_operation(operation, src_val, src_val_type))
+    return next_index
+
+  return execute
+
+###################################### READ ########################################
+def compile_read(instruction:Instruction) -> CompiledInstruction:
+  set_destination = compile_variable_setter(instruction, instruction.arguments[0])
+
+  variable_output_type = ArgumentTypeToVariableType[instruction.arguments[1].value]
+
+  def execute(state:ExecutionState, next_index:int):
+    set_destination(state, *handle_read_operation(state.input_file, variable_output_type))
+    return next_index
+
+  return execute
+
+##################################### WRITE ########################################
+def compile_write(instruction:Instruction) -> CompiledInstruction:
+  get_source = compile_symbol_getter(instruction, instruction.arguments[0])
+
+  def execute(state:ExecutionState, next_index:int):
+    state.output.write(value_to_string(*get_source(state)))
+    return next_index
+
+  return execute
+
+###################################### JUMP ########################################
+def compile_jump(instruction:Instruction) -> CompiledInstruction:
+  target_index = instruction.arguments[0].target_index
+
+  def execute(state:ExecutionState, next_index:int):
+    return target_index
+
+  return execute
+
+#################################### JUMPIFEQ ######################################
+################################### JUMPIFNEQ ######################################
+def compile_conditional_jump(instruction:Instruction) -> CompiledInstruction:
+  target_index = instruction.arguments[0].target_index
+  operation = instruction.instruction
+  jump_if_equal = operation == InstructionKey.JUMPIFEQ
+  get_operand1 = compile_symbol_getter(instruction, instruction.arguments[1])
+  get_operand2 = compile_symbol_getter(instruction, instruction.arguments[2])
+
+  def execute(state:ExecutionState, next_index:int):
+    operand1_type, operand1 = get_operand1(state)
+    operand2_type, operand2 = get_operand2(state)
+
+    if operand2_type != operand1_type and operand1_type != VariableTypeKey.NIL and operand2_type != VariableTypeKey.NIL:
+      handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"Incompatible type {operand1_type} and {operand2_type} in operation {operation.name}")
+
+    if (operand1 == operand2) == jump_if_equal:
+      return target_index
+    return next_index
+
+  return execute
+
+############################ LTJUMP, GTJUMP, EQJUMP ################################
+def compile_compare_jump(instruction:Instruction) -> CompiledInstruction:
+  target_index = instruction.arguments[0].target_index
+  operation = SUPERINSTRUCTION_COMPARISONS[instruction.instruction]
+  # Operands are reported as operands of fused comparison
+  comparison = Instruction(operation, instruction.order, instruction.arguments[1:4])
+  set_destination = compile_variable_setter(comparison, comparison.arguments[0])
+  get_operand1 = compile_symbol_getter(comparison, comparison.arguments[1])
+  get_operand2 = compile_symbol_getter(comparison, comparison.arguments[2])
+  jump_result = instruction.arguments[4].value
+  kernels = get_binary_operation_kernels(operation)
+
+  def execute(state:ExecutionState, next_index:int):
+    src_val_type1, src_val1 = get_operand1(state)
+    src_val_type2, src_val2 = get_operand2(state)
+
+    kernel = kernels.get((src_val_type1, src_val_type2))
+    if kernel is None:
+      result_type, result = perform_binary_operation(operation, src_val1, src_val_type1, src_val2, src_val_type2)
+    else:
+      result_type, result = kernel(src_val1, src_val2)
+
+    # Result is still stored because variable can be used after jump
+    set_destination(state, result_type, result)
+    if result == jump_result:
+      return target_index
+    return next_index
+
+  return execute
+
+###################################### EXIT ########################################
+def compile_exit(instruction:Instruction) -> CompiledInstruction:
+  src = instruction.arguments[0]
+  get_source = compile_symbol_getter(instruction, src)
+
+  def execute(state:ExecutionState, next_index:int):
+    # Get return code
+    src_val_type, src_val = get_source(state)
+
+    if src_val_type != VariableTypeKey.INT:
+      handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{src.type} as argument for EXIT instruction")
+
+    if not (0 <= src_val <= 49):
+      handle_error(ErrorCodes.BAD_OPERAND_VALUE, f"{src_val} is not valid value for EXIT operation, only int with value 0 <= x <= 49 are valid")
+
+    raise ProgramExit(int(src_val))
+
+  return execute
+
+##################################### DPRINT #######################################
+def compile_dprint(instruction:Instruction) -> CompiledInstruction:
+  get_source = compile_symbol_getter(instruction, instruction.arguments[0])
+
+  def execute(state:ExecutionState, next_index:int):
+    # Program output written before must appear first
+    state.output.flush()
+    sys.stderr.write(value_to_string(*get_source(state)))
+    return next_index
+
+  return execute
+
+###################################### BREAK #######################################
+def compile_break(instruction:Instruction) -> CompiledInstruction:
+  def execute(state:ExecutionState, next_index:int):
+    state.output.flush()
+    sys.stderr.write(f"Instruction: {instruction}\n")
+    sys.stderr.write(f"Code position: {instruction.order}\n")
+    sys.stderr.write(f"Global frame:\n{state.global_frame}\n\n")
+    sys.stderr.write("Local frames:\n")
+    for loc_frame in state.local_frame_stack:
+      sys.stderr.write(f"{loc_frame}\n")
+    sys.stderr.write("\nTemporary frame:\n")
+    if state.temporary_frame is not None:
+      sys.stderr.write(f"{state.temporary_frame}\n")
+
+    sys.stderr.write(f"\nCall stack:\n{state.call_stack}\n")
+    sys.stderr.write(f"Data stack:\n{state.data_stack}")
+    return next_index
+
+  return execute
+
+##################################### CLEARS #######################################
+def compile_clears(instruction:Instruction) -> CompiledInstruction:
+  def execute(state:ExecutionState, next_index:int):
+    state.data_stack.clear()
+    return next_index
+
+  return execute
+
+################################# Stack bin op #####################################
+def compile_stack_binary_operation(instruction:Instruction) -> CompiledInstruction:
+  operation = instruction.instruction
+  missing_arguments_message = f"Instruction '{operation}' missing arguments on data stack"
+  kernels = get_binary_operation_kernels(operation)
+
+  def execute(state:ExecutionState, next_index:int):
+    data_stack = state.data_stack
+    if len(data_stack.types) < 2:
+      handle_error(ErrorCodes.MISSING_VALUE, missing_arguments_message)
+
+    stack_binary_operation(operation, kernels, data_stack.types, data_stack.values)
+    return next_index
+
+  return execute
+
+################################ Stack unary op ####################################
+def compile_stack_unary_operation(instruction:Instruction) -> CompiledInstruction:
+  operation = instruction.instruction
+  missing_arguments_message = f"Instruction '{operation}' missing arguments on data stack"
+
+  def execute(state:ExecutionState, next_index:int):
+    data_stack = state.data_stack
+    if not data_stack.types:
+      handle_error(ErrorCodes.MISSING_VALUE, missing_arguments_message)
+
+    stack_unary_operation(operation, data_stack.types, data_stack.values)
+    return next_index
+
+  return execute
+
+#################################### JUMPIFEQS #####################################
+################################### JUMPIFNEQS #####################################
+def compile_stack_conditional_jump(instruction:Instruction) -> CompiledInstruction:
+  target_index = instruction.arguments[0].target_index
+  operation = instruction.instruction
+  jump_if_equal = operation == InstructionKey.JUMPIFEQS
+  missing_arguments_message = f"Instruction '{operation}' missing arguments on data stack"
+
+  def execute(state:ExecutionState, next_index:int):
+    data_stack_types = state.data_stack.types
+    data_stack_values = state.data_stack.values
+    if len(data_stack_types) < 2:
+      handle_error(ErrorCodes.MISSING_VALUE, missing_arguments_message)
+
+    arg2_type = data_stack_types.pop()
+    arg2_val = data_stack_values.pop()
+    arg1_type = data_stack_types.pop()
+    arg1_val = data_stack_values.pop()
+
+    if arg1_type != arg2_type and arg1_type != VariableTypeKey.NIL and arg2_type != VariableTypeKey.NIL:
+      handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"Incompatible type {arg1_type} and {arg2_type} in operation {operation.name}")
+
+    if (arg1_val == arg2_val) == jump_if_equal:
+      return target_index
+    return next_index
+
+  return execute
+
+# Table of compile functions for every instruction
+INSTRUCTION_COMPILERS:Dict[InstructionKey, Callable[[Instruction], CompiledInstruction]] = {
+  InstructionKey.LABEL: compile_label,
+
+  InstructionKey.CREATEFRAME: compile_createframe,
+  InstructionKey.PUSHFRAME: compile_pushframe,
+  InstructionKey.POPFRAME: compile_popframe,
+  InstructionKey.DEFVAR: compile_defvar,
+  InstructionKey.MOVE: compile_move,
+
+  InstructionKey.CALL: compile_call,
+  InstructionKey.RETURN: compile_return,
+
+  InstructionKey.PUSHS: compile_pushs,
+  InstructionKey.POPS: compile_pops,
+
+  InstructionKey.ADD: compile_binary_operation,
+  InstructionKey.SUB: compile_binary_operation,
+  InstructionKey.MUL: compile_binary_operation,
+  InstructionKey.DIV: compile_binary_operation,
+  InstructionKey.IDIV: compile_binary_operation,
+  InstructionKey.LT: compile_binary_operation,
+  InstructionKey.GT: compile_binary_operation,
+  InstructionKey.EQ: compile_binary_operation,
+  InstructionKey.AND: compile_binary_operation,
+  InstructionKey.OR: compile_binary_operation,
+  InstructionKey.STRI2INT: compile_binary_operation,
+  InstructionKey.CONCAT: compile_concat,
+  InstructionKey.GETCHAR: compile_binary_operation,
+  InstructionKey.SETCHAR: compile_setchar,
+
+  InstructionKey.NOT: compile_unary_operation,
+  InstructionKey.INT2CHAR: compile_unary_operation,
+  InstructionKey.INT2FLOAT: compile_unary_operation,
+  InstructionKey.FLOAT2INT: compile_unary_operation,
+  InstructionKey.STRLEN: compile_unary_operation,
+  InstructionKey.TYPE: compile_unary_operation,
+
+  InstructionKey.READ: compile_read,
+  InstructionKey.WRITE: compile_write,
+
+  InstructionKey.JUMP: compile_jump,
+  InstructionKey.JUMPIFEQ: compile_conditional_jump,
+  InstructionKey.JUMPIFNEQ: compile_conditional_jump,
+  InstructionKey.EXIT: compile_exit,
+
+  InstructionKey.DPRINT: compile_dprint,
+  InstructionKey.BREAK: compile_break,
+
+  # Stack operations
+  InstructionKey.CLEARS: compile_clears,
+
+  InstructionKey.ADDS: compile_stack_binary_operation,
+  InstructionKey.SUBS: compile_stack_binary_operation,
+  InstructionKey.MULS: compile_stack_binary_operation,
+  InstructionKey.DIVS: compile_stack_binary_operation,
+  InstructionKey.IDIVS: compile_stack_binary_operation,
+  InstructionKey.LTS: compile_stack_binary_operation,
+  InstructionKey.GTS: compile_stack_binary_operation,
+  InstructionKey.EQS: compile_stack_binary_operation,
+  InstructionKey.ANDS: compile_stack_binary_operation,
+  InstructionKey.ORS: compile_stack_binary_operation,
+  InstructionKey.STRI2INTS: compile_stack_binary_operation,
+
+  InstructionKey.NOTS: compile_stack_unary_operation,
+  InstructionKey.INT2CHARS: compile_stack_unary_operation,
+  InstructionKey.INT2FLOATS: compile_stack_unary_operation,
+  InstructionKey.FLOAT2INTS: compile_stack_unary_operation,
+
+  InstructionKey.JUMPIFEQS: compile_stack_conditional_jump,
+  InstructionKey.JUMPIFNEQS: compile_stack_conditional_jump,
+
+  # Superinstructions
+  InstructionKey.LTJUMP: compile_compare_jump,
+  InstructionKey.GTJUMP: compile_compare_jump,
+  InstructionKey.EQJUMP: compile_compare_jump
+}
+
+# Compile sorted instructions to list of specialised functions, all static checks are performed here
+def compile_program(instructions:List[Instruction]) -> List[CompiledInstruction]:
+  return [INSTRUCTION_COMPILERS[instruction.instruction](instruction) for instruction in instructions]
@@ -1,6 +1,6 @@
 import sys
 import enum
-from typing import Optional
+from typing import Optional, Dict, Type, NoReturn
 
 class ErrorCodes(enum.Enum):
   BAD_ARG = 10
@@ -21,7 +21,70 @@ class ErrorCodes(enum.Enum):
 
   INTERN = 99
 
-def handle_error(error_code: ErrorCodes, message:Optional[str]=None):
-  if message is not None:
-    sys.stderr.write(f"[Error]({error_code.name}) {message}\n")
-  sys.exit(error_code.value)
\ No newline at end of file
+# Base of all errors reported by interpreter, error is caught by entry point which exits with its code
+class InterpreterError(Exception):
+  error_code = ErrorCodes.INTERN
+
+  def __init__(self, message:Optional[str]=None):
+    super().__init__(message)
+    self.message = message
+
+class ArgumentError(InterpreterError):
+  error_code = ErrorCodes.BAD_ARG
+
+class InputFileError(InterpreterError):
+  error_code = ErrorCodes.INPUT_FILE
+
+class OutputFileError(InterpreterError):
+  error_code = ErrorCodes.OUTPUT_FILE
+
+# Errors of source program detected before it is executed
+class SourceError(InterpreterError):
+  pass
+
+class XMLFormatError(SourceError):
+  error_code = ErrorCodes.XML_INPUT_FORMAT
+
+class XMLStructureError(SourceError):
+  error_code = ErrorCodes.XML_BAD_STRUCTURE
+
+class SemanticError(SourceError):
+  error_code = ErrorCodes.SEMANTIC_ERROR
+
+# Errors of source program detected while it is executed
+class ExecutionError(InterpreterError):
+  pass
+
+class OperandTypeError(ExecutionError):
+  error_code = ErrorCodes.BAD_OPERAND_TYPE
+
+class VariableError(ExecutionError):
+  error_code = ErrorCodes.VARIABLE_DONT_EXIST
+
+class FrameError(ExecutionError):
+  error_code = ErrorCodes.FRAME_DONT_EXIST
+
+class MissingValueError(ExecutionError):
+  error_code = ErrorCodes.MISSING_VALUE
+
+class OperandValueError(ExecutionError):
+  error_code = ErrorCodes.BAD_OPERAND_VALUE
+
+class StringOperationError(ExecutionError):
+  error_code = ErrorCodes.BAD_STRING_OPERATION
+
+class InternalError(InterpreterError):
+  error_code = ErrorCodes.INTERN
+
+ERROR_TYPES:Dict[ErrorCodes, Type[InterpreterError]] = {error_type.error_code: error_type for error_type in (
+  ArgumentError, InputFileError, OutputFileError, XMLFormatError, XMLStructureError, SemanticError, OperandTypeError,
+  VariableError, FrameError, MissingValueError, OperandValueError, StringOperationError, InternalError)}
+
+def handle_error(error_code: ErrorCodes, message:Optional[str]=None) -> NoReturn:
+  raise ERROR_TYPES[error_code](message)
+
+# Report error caught by entry point, returns exit code of interpreter
+def report_error(error:InterpreterError) -> int:
+  if error.message is not None:
+    sys.stderr.write(f"[Error]({error.error_code.name}) {error.message}\n")
+  return error.error_code.value
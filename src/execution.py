@@ -0,0 +1,107 @@
+import time
+from typing import List, Optional, Callable
+
+from interpreter_objects import Frame, FrameTypeKey, VariableCounter, DataStack, DEFAULT_MAX_STACK_DEPTH
+from helpers import InputFile, OutputBuffer
+from stats import StatsCollector
+from profiler import Profiler
+
+# Raised by EXIT instruction to stop program with given exit code
+class ProgramExit(Exception):
+  def __init__(self, exit_code:int):
+    super().__init__(exit_code)
+    self.exit_code = exit_code
+
+class ExecutionState:
+  def __init__(self, code:List[Callable], global_variable_names:List[str], local_variable_names:List[str],
+               input_file:InputFile, output:OutputBuffer, stats:Optional[StatsCollector]=None, profiler:Optional[Profiler]=None,
+               max_stack_depth:int=DEFAULT_MAX_STACK_DEPTH):
+    self.code = code
+    # Local and temporary frames share slots because temporary frame becomes local after PUSHFRAME
+    self.local_variable_names = local_variable_names
+    self.input_file = input_file
+    self.output = output
+    self.stats = stats
+    self.profiler = profiler
+
+    # Data stack and call stack can't grow over maximum depth
+    self.data_stack = DataStack(max_stack_depth)
+    self.call_stack:List[int] = []
+    self.max_stack_depth = max_stack_depth
+    self.variable_counter = VariableCounter()
+    self.global_frame = Frame(FrameTypeKey.GLOBAL, global_variable_names, self.variable_counter)
+    self.local_frame_stack:List[Frame] = []
+    self.temporary_frame:Optional[Frame] = None
+
+  def save_stats(self):
+    if self.stats is not None:
+      self.stats.save(self.variable_counter.max_initialized_variables)
+
+  def save_profile(self):
+    if self.profiler is not None:
+      self.profiler.save()
+
+# Execute program until its end or EXIT instruction, returns exit code of program
+def execute_program(state:ExecutionState) -> int:
+  code = state.code
+  number_of_instructions = len(code)
+  instruction_index = 0
+  exit_code = 0
+
+  try:
+    if state.profiler is not None:
+      execute_profiled_program(state, state.profiler)
+    elif state.stats is not None:
+      instruction_calls = state.stats.instruction_calls
+      while instruction_index < number_of_instructions:
+        next_instruction_index = code[instruction_index](state, instruction_index + 1)
+        instruction_calls[instruction_index] += 1
+        instruction_index = next_instruction_index
+    else:
+      # Every compiled instruction returns index of next instruction
+      while instruction_index < number_of_instructions:
+        instruction_index = code[instruction_index](state, instruction_index + 1)
+  except ProgramExit as program_exit:
+    exit_code = program_exit.exit_code
+
+  state.save_stats()
+  state.save_profile()
+  state.output.flush()
+  return exit_code
+
+# Execute program and measure time of every instruction, it is also counted to statistics
+def execute_profiled_program(state:ExecutionState, profiler:Profiler):
+  code = state.code
+  number_of_instructions = len(code)
+  instruction_index = 0
+  executed_instructions = 0
+
+  timer = time.perf_counter_ns
+  events = profiler.events
+  instruction_calls = profiler.instruction_calls
+  instruction_times = profiler.instruction_times
+
+  profiler.start(timer())
+  try:
+    while instruction_index < number_of_instructions:
+      start_time = timer()
+      next_instruction_index = code[instruction_index](state, instruction_index + 1)
+      end_time = timer()
+      instruction_times[instruction_index] += end_time - start_time
+      instruction_calls[instruction_index] += 1
+      executed_instructions += 1
+
+      # Instructions after CALL or RETURN are counted to other stack of called labels
+      event = events[instruction_index]
+      if event is not None:
+        event(state, instruction_index, end_time, executed_instructions)
+        instruction_calls = profiler.instruction_calls
+        instruction_times = profiler.instruction_times
+
+      instruction_index = next_instruction_index
+  finally:
+    profiler.finish(timer(), executed_instructions)
+
+    if state.stats is not None:
+      for index, calls in enumerate(profiler.get_total_instruction_calls()):
+        state.stats.instruction_calls[index] += calls
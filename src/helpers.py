@@ -1,63 +1,91 @@
+import io
 import os
-from typing import List, Optional, Any, Tuple
+import sys
+from typing import Optional, Iterable, Iterator
 
 from errors import ErrorCodes, handle_error
-from interpreter_objects import FrameTypeKey, Frame, VariableTypeKey
+from interpreter_objects import VariableTypeKey
 
 def is_numerical(t: VariableTypeKey):
   return t in (VariableTypeKey.INT, VariableTypeKey.FLOAT)
 
+# Collects program output and writes it to stream in large blocks
+class OutputBuffer:
+  def __init__(self, stream=None, flush_threshold:int=1 << 16):
+    self.stream = stream if stream is not None else sys.stdout
+    self.flush_threshold = flush_threshold
+
+    self.buffer = []
+    self.buffer_size = 0
+
+  def write(self, text:str):
+    self.buffer.append(text)
+    self.buffer_size += len(text)
+    if self.buffer_size >= self.flush_threshold:
+      self.flush()
+
+  def flush(self):
+    if self.buffer:
+      self.stream.write("".join(self.buffer))
+      self.buffer.clear()
+      self.buffer_size = 0
+    self.stream.flush()
+
+# Source of lines for READ instruction, input file is read lazily line by line
 class InputFile:
   def __init__(self, file_path:str = None):
-    self.input_data_file_index = -1
-    self.input_file_data = None
+    self.input_stream = None
+    self.end_reached = False
+    # Iterator of lines when input isn't read from stream
+    self.lines:Optional[Iterator[str]] = None
 
     if file_path:
       if not os.path.exists(file_path) or not os.path.isfile(file_path):
         handle_error(ErrorCodes.INPUT_FILE, "Failed to open input file")
 
-      with open(file_path, "r", encoding="utf-8") as f:
-        self.input_file_data = f.read().split("\n")
+      try:
+        self.input_stream = open(file_path, "r", encoding="utf-8", buffering=1 << 20)
+      except OSError:
+        handle_error(ErrorCodes.INPUT_FILE, "Failed to open input file")
+
+  # Create input from text already in memory, None means that there is no input at all
+  @classmethod
+  def from_text(cls, text:Optional[str]):
+    input_file = cls()
+    input_file.input_stream = io.StringIO(text if text is not None else "")
+    input_file.end_reached = text is None
+    return input_file
+
+  # Create input from lines already split (without new line characters)
+  @classmethod
+  def from_lines(cls, lines:Iterable[str]):
+    input_file = cls()
+    input_file.lines = iter(lines)
+    return input_file
 
   def get_line(self):
-    if self.input_file_data is None:
+    if self.lines is not None:
+      return next(self.lines, None)
+
+    if self.input_stream is None:
       try:
         return input()
       except:
         return None
-    else:
-      self.input_data_file_index += 1
-      if self.input_data_file_index >= len(self.input_file_data):
-        return None
-      return self.input_file_data[self.input_data_file_index]
-
-def get_value_from_frames(frame_type: FrameTypeKey, label:str, global_frame:Frame, local_frame_stack:List[Frame], temporary_frame:Optional[Frame]) -> Tuple[VariableTypeKey, Any]:
-  if frame_type == FrameTypeKey.GLOBAL:
-    val_type, src_val = global_frame.get_value(label)
-  elif frame_type == FrameTypeKey.LOCAL:
-    if len(local_frame_stack) == 0:
-      handle_error(ErrorCodes.FRAME_DONT_EXIST, "Local frame doesn't exist")
-    val_type, src_val = local_frame_stack[-1].get_value(label)
-  elif frame_type == FrameTypeKey.TEMPORARY:
-    if temporary_frame is None:
-      handle_error(ErrorCodes.FRAME_DONT_EXIST, "Temporary frame doesn't exist")
-    val_type, src_val = temporary_frame.get_value(label)
-  else:
-    handle_error(ErrorCodes.INTERN, "Invalid frame indentifier")
-    raise
-
-  return val_type, src_val
-
-def set_value_in_frames(frame_type: FrameTypeKey, label:str, value:Any, global_frame:Frame, local_frame_stack:List[Frame], temporary_frame:Optional[Frame]):
-  if frame_type == FrameTypeKey.GLOBAL:
-    global_frame.set_value(label, value)
-  elif frame_type == FrameTypeKey.LOCAL:
-    if len(local_frame_stack) == 0:
-      handle_error(ErrorCodes.FRAME_DONT_EXIST, "Local frame doesn't exist")
-    local_frame_stack[-1].set_value(label, value)
-  elif frame_type == FrameTypeKey.TEMPORARY:
-    if temporary_frame is None:
-      handle_error(ErrorCodes.FRAME_DONT_EXIST, "Temporary frame doesn't exist")
-    temporary_frame.set_value(label, value)
-  else:
-    handle_error(ErrorCodes.INTERN, "Invalid frame indentifier")
\ No newline at end of file
+
+    if self.end_reached:
+      return None
+
+    try:
+      line = self.input_stream.readline()
+    except UnicodeDecodeError:
+      handle_error(ErrorCodes.INPUT_FILE, "Failed to decode input file")
+      raise
+
+    if line.endswith("\n"):
+      return line[:-1]
+
+    # Text after last new line (even empty) is last line of input
+    self.end_reached = True
+    self.input_stream.close()
+    return line
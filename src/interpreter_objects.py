@@ -1,12 +1,10 @@
 from enum import Enum, auto
-import re
-from typing import List, Optional, Any, Tuple, Dict
+import sys
+from typing import List, Optional, Any, Tuple, NoReturn
 import xml.etree.ElementTree as XML
 
 from errors import ErrorCodes, handle_error
 
-escapes=re.compile(r"\\[0-9]{3}")
-
 class InstructionKey(Enum):
   MOVE = auto()#
 
@@ -82,6 +80,18 @@ class InstructionKey(Enum):
   JUMPIFEQS = auto()#
   JUMPIFNEQS = auto()#
 
+  # Superinstructions created when program is loaded, they can't be used in source code
+  LTJUMP = auto()
+  GTJUMP = auto()
+  EQJUMP = auto()
+
+# Comparison performed by compare and jump superinstruction
+SUPERINSTRUCTION_COMPARISONS = {
+  InstructionKey.LTJUMP: InstructionKey.LT,
+  InstructionKey.GTJUMP: InstructionKey.GT,
+  InstructionKey.EQJUMP: InstructionKey.EQ
+}
+
 STRING_TO_INSTRUCTION = {
   "MOVE": InstructionKey.MOVE,
   "CREATEFRAME": InstructionKey.CREATEFRAME,
@@ -117,6 +127,7 @@ STRING_TO_INSTRUCTION = {
   "LABEL": InstructionKey.LABEL,
   "JUMP": InstructionKey.JUMP,
   "JUMPIFEQ": InstructionKey.JUMPIFEQ,
+  "JUMPIFNEQ": InstructionKey.JUMPIFNEQ,
   "EXIT": InstructionKey.EXIT,
   "DPRINT": InstructionKey.DPRINT,
   "BREAK": InstructionKey.BREAK,
@@ -168,6 +179,79 @@ STRING_TO_ARGUMENT_TYPE = {
   "nil": ArgumentTypeKey.NIL
 }
 
+# Allowed types of arguments of instruction on every position, symbol is constant or variable
+VAR_ARGUMENT = (ArgumentTypeKey.VAR,)
+SYMBOL_ARGUMENT = (ArgumentTypeKey.VAR, ArgumentTypeKey.INT, ArgumentTypeKey.FLOAT, ArgumentTypeKey.BOOL, ArgumentTypeKey.STRING, ArgumentTypeKey.NIL)
+LABEL_ARGUMENT = (ArgumentTypeKey.LABEL,)
+TYPE_ARGUMENT = (ArgumentTypeKey.TYPE,)
+
+# Arguments of every instruction, checked once when instruction is loaded so compiled instructions can rely on them
+INSTRUCTION_SCHEMAS = {
+  InstructionKey.MOVE: (VAR_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.CREATEFRAME: (),
+  InstructionKey.PUSHFRAME: (),
+  InstructionKey.POPFRAME: (),
+  InstructionKey.DEFVAR: (VAR_ARGUMENT,),
+  InstructionKey.CALL: (LABEL_ARGUMENT,),
+  InstructionKey.RETURN: (),
+  InstructionKey.PUSHS: (SYMBOL_ARGUMENT,),
+  InstructionKey.POPS: (VAR_ARGUMENT,),
+  InstructionKey.ADD: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.SUB: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.MUL: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.DIV: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.IDIV: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.LT: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.GT: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.EQ: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.AND: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.OR: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.NOT: (VAR_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.INT2CHAR: (VAR_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.STRI2INT: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.INT2FLOAT: (VAR_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.FLOAT2INT: (VAR_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.READ: (VAR_ARGUMENT, TYPE_ARGUMENT),
+  InstructionKey.WRITE: (SYMBOL_ARGUMENT,),
+  InstructionKey.CONCAT: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.STRLEN: (VAR_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.GETCHAR: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.SETCHAR: (VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.TYPE: (VAR_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.JUMP: (LABEL_ARGUMENT,),
+  InstructionKey.JUMPIFEQ: (LABEL_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.JUMPIFNEQ: (LABEL_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT),
+  InstructionKey.EXIT: (SYMBOL_ARGUMENT,),
+  InstructionKey.LABEL: (LABEL_ARGUMENT,),
+  InstructionKey.DPRINT: (SYMBOL_ARGUMENT,),
+  InstructionKey.BREAK: (),
+
+  # Stack operations
+  InstructionKey.CLEARS: (),
+  InstructionKey.ADDS: (),
+  InstructionKey.SUBS: (),
+  InstructionKey.MULS: (),
+  InstructionKey.DIVS: (),
+  InstructionKey.IDIVS: (),
+  InstructionKey.LTS: (),
+  InstructionKey.GTS: (),
+  InstructionKey.EQS: (),
+  InstructionKey.ANDS: (),
+  InstructionKey.ORS: (),
+  InstructionKey.NOTS: (),
+  InstructionKey.INT2CHARS: (),
+  InstructionKey.STRI2INTS: (),
+  InstructionKey.INT2FLOATS: (),
+  InstructionKey.FLOAT2INTS: (),
+  InstructionKey.JUMPIFEQS: (LABEL_ARGUMENT,),
+  InstructionKey.JUMPIFNEQS: (LABEL_ARGUMENT,),
+
+  # Superinstructions have label, destination, both compared symbols and result of comparison which causes jump
+  InstructionKey.LTJUMP: (LABEL_ARGUMENT, VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT, (ArgumentTypeKey.BOOL,)),
+  InstructionKey.GTJUMP: (LABEL_ARGUMENT, VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT, (ArgumentTypeKey.BOOL,)),
+  InstructionKey.EQJUMP: (LABEL_ARGUMENT, VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT, (ArgumentTypeKey.BOOL,))
+}
+
 class FrameTypeKey(Enum):
   GLOBAL = auto()
   LOCAL = auto()
@@ -180,15 +264,35 @@ STRING_TO_FRAME_TYPE = {
 }
 
 
-def dec2char(matchobj):
-  dec = matchobj.group(0)
-  dec = int(dec[1:])
-  return chr(dec)
+# Character of every escape sequence \ddd in string literal, keyed by its three digits
+ESCAPE_CHARACTERS = {f"{code:03d}": chr(code) for code in range(1000)}
+
+# Decode escape sequences of string literal in one pass, backslash not followed by three digits is kept as it is
+# Decoded literals are interned so identical constants of all instructions share one object
+def decode_string_literal(value:str) -> str:
+  if "\\" in value:
+    parts = value.split("\\")
+    decoded = [parts[0]]
+    for part in parts[1:]:
+      character = ESCAPE_CHARACTERS.get(part[:3])
+      if character is None:
+        decoded.append("\\")
+        decoded.append(part)
+      else:
+        decoded.append(character)
+        decoded.append(part[3:])
+    value = "".join(decoded)
+
+  return sys.intern(value)
 
 class Argument:
   def __init__(self, t:ArgumentTypeKey, value:str, idx:int):
     self.idx = idx
     self.type = t
+    # Index of instruction where jump to label continues, resolved before execution
+    self.target_index:Optional[int] = None
+    # Slot of variable in frame, assigned before execution
+    self.slot:Optional[int] = None
     if value is None:
       value = ""
 
@@ -213,7 +317,7 @@ class Argument:
       else:
         self.value = False
     elif self.type == ArgumentTypeKey.STRING:
-      self.value = escapes.sub(dec2char, value)
+      self.value = decode_string_literal(value)
     elif self.type == ArgumentTypeKey.LABEL:
       self.value = value
     elif self.type == ArgumentTypeKey.TYPE:
@@ -238,6 +342,17 @@ class Argument:
     else:
       handle_error(ErrorCodes.XML_BAD_STRUCTURE, f"Type '{self.type}' and value '{value}' is not valid combination of values")
 
+  # Create argument from already converted value (no parsing or checks)
+  @classmethod
+  def from_value(cls, t:ArgumentTypeKey, value:Any, idx:int):
+    argument = cls.__new__(cls)
+    argument.idx = idx
+    argument.type = t
+    argument.value = value
+    argument.target_index = None
+    argument.slot = None
+    return argument
+
   def __repr__(self):
     return f"Argument(Type: {self.type}, Value: '{self.value}')"
 
@@ -290,7 +405,20 @@ class Instruction:
       handle_error(ErrorCodes.XML_BAD_STRUCTURE, f"'{instruction_name}' have invalid argument indexes")
 
     arguments.sort(key=lambda x: x.idx)
-    return cls(STRING_TO_INSTRUCTION[instruction_name], int(order), arguments)
+
+    instruction = cls(STRING_TO_INSTRUCTION[instruction_name], int(order), arguments)
+    instruction.check_arguments()
+    return instruction
+
+  # Check number and types of arguments against schema of instruction
+  def check_arguments(self):
+    schema = INSTRUCTION_SCHEMAS[self.instruction]
+    if len(self.arguments) != len(schema):
+      handle_error(ErrorCodes.XML_BAD_STRUCTURE, f"Instruction '{self.instruction}' incorrect number of arguments")
+
+    for argument, allowed_types in zip(self.arguments, schema):
+      if argument.type not in allowed_types:
+        handle_error(ErrorCodes.XML_BAD_STRUCTURE, f"Argument {argument.idx} of instruction '{self.instruction.name}' can't have type '{argument.type.name.lower()}'")
 
   def __repr__(self):
     arguments_string = (", ".join([str(arg) for arg in self.arguments])) if self.arguments else ""
@@ -311,81 +439,148 @@ ArgumentTypeToVariableType = {
   ArgumentTypeKey.NIL: VariableTypeKey.NIL
 }
 
-class Variable:
-  def __init__(self, label:str):
-    self.__label = label
-
-    self.__type:Optional[VariableTypeKey] = None
-    self.__value = None
-
-  def is_initialized(self):
-    return self.__type is not None
-
-  def set_value(self, value):
-    if isinstance(value, bool):
-      self.__type = VariableTypeKey.BOOL
-    elif isinstance(value, int):
-      self.__type = VariableTypeKey.INT
-    elif isinstance(value, float):
-      self.__type = VariableTypeKey.FLOAT
-    elif isinstance(value, str):
-      self.__type = VariableTypeKey.STRING
-    elif value is None:
-      self.__type = VariableTypeKey.NIL
-    else:
-      handle_error(ErrorCodes.INTERN, f"Invalid datatype '{type(value)}' passed to variable")
-    self.__value = value
+# Running number of initialized variables in all frames of one program execution
+class VariableCounter:
+  def __init__(self):
+    self.initialized_variables = 0
+    self.max_initialized_variables = 0
 
-  def get_label(self):
-    return self.__label
+# Type of variable slot that was not defined by DEFVAR in frame yet (type None marks uninitialized variable)
+UNDEFINED_VARIABLE = object()
 
-  def get_value(self) -> Tuple[VariableTypeKey, Any]:
-    return self.__type, self.__value
+# Type of variable slot holding StringBuffer, the buffer is read as string by instructions which don't modify it in place
+STRING_BUFFER = object()
 
-  def __repr__(self):
-    return f"[{self.__label}:{self.__type}='{self.__value}']"
+# Mutable string of variable used by SETCHAR and CONCAT appending to same variable, so building long strings isn't quadratic
+# String is joined only when it is needed and kept until next modification
+class StringBuffer:
+  def __init__(self, value:str):
+    self.characters = list(value)
+    self.value:Optional[str] = value
 
-class Frame:
-  def __init__(self, frame_type: FrameTypeKey):
-    self.type = frame_type # only for debug
+  def append(self, value:str):
+    self.characters.extend(value)
+    self.value = None
 
-    self.variable_storage:Dict[str, Variable] = {}
+  def set_character(self, index:int, character:str):
+    self.characters[index] = character
+    self.value = None
 
-  def __get_by_name(self, label:str):
-    if not self.__variable_exist(label): return None
-    return self.variable_storage.get(label)
+  def __len__(self):
+    return len(self.characters)
 
-  def __variable_exist(self, label:str) -> bool:
-    if label in self.variable_storage.keys(): return True
-    return False
+  def __getitem__(self, index:int) -> str:
+    return self.characters[index]
 
-  def create_variable(self, label:str):
-    if self.__variable_exist(label):
-      handle_error(ErrorCodes.SEMANTIC_ERROR, f"Variable with name '{label}' already exists in frame of type '{self.type}'")
-    self.variable_storage[label] = Variable(label)
+  def __str__(self):
+    if self.value is None:
+      self.value = "".join(self.characters)
+    return self.value
 
-  def set_value(self, label:str, value):
-    variable = self.__get_by_name(label)
-    if variable is None:
-      handle_error(ErrorCodes.VARIABLE_DONT_EXIST, f"Variable with name '{label}' doesn't exists in frame of type '{self.type}'")
+# Maximum number of items of data stack and call stack, deeper stack is result of runaway pushes or recursion
+DEFAULT_MAX_STACK_DEPTH = 1000000
 
-    variable.set_value(value)
+# Data stack keeps types and values of items in parallel lists
+# Compiled instructions push, pop and replace items of the lists directly because method call per stack operation
+# is measurably slower in stack heavy loops, pushes have to check maximum depth
+class DataStack:
+  def __init__(self, max_depth:int=DEFAULT_MAX_STACK_DEPTH):
+    self.types:List[Any] = []
+    self.values:List[Any] = []
+    self.max_depth = max_depth
 
-  def get_value(self, label:str) -> Tuple[VariableTypeKey, Any]:
-    variable = self.__get_by_name(label)
-    if variable is None:
-      handle_error(ErrorCodes.VARIABLE_DONT_EXIST, f"Variable with name '{label}' doesn't exists in frame of type '{self.type}'")
+  def report_overflow(self) -> NoReturn:
+    handle_error(ErrorCodes.INTERN, f"Data stack exceeded maximum depth {self.max_depth}")
 
-    return variable.get_value()
+  def clear(self):
+    self.types.clear()
+    self.values.clear()
 
-  def get_number_of_initialized_variables(self):
-    cnt = 0
-    for var in self.variable_storage.values():
-      if var.is_initialized():
-        cnt += 1
+  # Items from bottom of stack with their types, used by BREAK
+  def __repr__(self):
+    items = ", ".join([f"{value_type}='{value}'" for value_type, value in zip(self.types, self.values)])
+    return f"[{items}]"
 
-    return cnt
+# Types of variables of local or temporary frame keyed by slot, slot missing in table is variable not defined by DEFVAR
+# Frames of functions use only few of all local names of program so only their slots are stored
+class SlotTable(dict):
+  def __missing__(self, slot:int):
+    return UNDEFINED_VARIABLE
+
+class Frame:
+  def __init__(self, frame_type: FrameTypeKey, variable_names: List[str], counter: VariableCounter):
+    self.type = frame_type # only for debug
+
+    # Initialized variables of this frame, counter is shared by all frames so total count is always available
+    self.initialized_variables = 0
+    self.counter = counter
+
+    # Every variable name of frame type has slot assigned before execution, types and values are stored in parallel tables indexed by slot
+    # Global frame is created once so it has lists for all global names, local and temporary frames only store variables they define
+    self.variable_names = variable_names
+    if frame_type == FrameTypeKey.GLOBAL:
+      self.variable_types:Any = [UNDEFINED_VARIABLE] * len(variable_names)
+      self.variable_values:Any = [None] * len(variable_names)
+    else:
+      self.variable_types = SlotTable()
+      self.variable_values = {}
+
+  def report_invalid_variable(self, slot:int, message:str):
+    if self.variable_types[slot] is UNDEFINED_VARIABLE:
+      handle_error(ErrorCodes.VARIABLE_DONT_EXIST, f"Variable with name '{self.variable_names[slot]}' doesn't exists in frame of type '{self.type}'")
+    handle_error(ErrorCodes.MISSING_VALUE, message)
+
+  # Read variable which doesn't hold plain value, string buffer can be returned without conversion to string
+  def read_special_variable(self, slot:int, message:str, allow_string_buffer:bool=False) -> Tuple[VariableTypeKey, Any]:
+    if self.variable_types[slot] is not STRING_BUFFER:
+      self.report_invalid_variable(slot, message)
+
+    string_buffer = self.variable_values[slot]
+    return VariableTypeKey.STRING, string_buffer if allow_string_buffer else str(string_buffer)
+
+  # String in variable is replaced by buffer which can be modified in place
+  def get_string_buffer(self, slot:int) -> StringBuffer:
+    if self.variable_types[slot] is not STRING_BUFFER:
+      self.variable_types[slot] = STRING_BUFFER
+      self.variable_values[slot] = StringBuffer(self.variable_values[slot])
+    return self.variable_values[slot]
+
+  def create_variable(self, slot:int):
+    if self.variable_types[slot] is not UNDEFINED_VARIABLE:
+      handle_error(ErrorCodes.SEMANTIC_ERROR, f"Variable with name '{self.variable_names[slot]}' already exists in frame of type '{self.type}'")
+    self.variable_types[slot] = None
+    self.variable_values[slot] = None
+
+  def set_value(self, slot:int, value_type:VariableTypeKey, value):
+    if self.variable_types[slot] is UNDEFINED_VARIABLE:
+      handle_error(ErrorCodes.VARIABLE_DONT_EXIST, f"Variable with name '{self.variable_names[slot]}' doesn't exists in frame of type '{self.type}'")
+
+    if self.variable_types[slot] is None:
+      self.initialized_variables += 1
+      counter = self.counter
+      counter.initialized_variables += 1
+      if counter.initialized_variables > counter.max_initialized_variables:
+        counter.max_initialized_variables = counter.initialized_variables
+
+    self.variable_types[slot] = value_type
+    self.variable_values[slot] = value
+
+  # Remove variables of frame from total count when frame is thrown away
+  def release(self):
+    self.counter.initialized_variables -= self.initialized_variables
+    self.initialized_variables = 0
 
   def __repr__(self):
-    variables = "\n\t".join([str(var) for var in self.variable_storage])
+    slots = range(len(self.variable_types)) if isinstance(self.variable_types, list) else sorted(self.variable_types)
+    variables = []
+    for slot in slots:
+      variable_type = self.variable_types[slot]
+      if variable_type is UNDEFINED_VARIABLE:
+        continue
+
+      # String buffer is dumped as string variable it represents
+      if variable_type is STRING_BUFFER:
+        variable_type = VariableTypeKey.STRING
+      variables.append(f"[{self.variable_names[slot]}:{variable_type}='{str(self.variable_values[slot])}']")
+    variables = "\n\t".join(variables)
     return f"Frame({self.type}:\n\t{variables})"
@@ -0,0 +1,126 @@
+import io
+import os
+import xml.etree.ElementTree as XML
+from typing import List, Union, BinaryIO, Optional
+
+from interpreter_objects import Instruction, InstructionKey
+from errors import ErrorCodes, InterpreterError, handle_error
+from bytecode import is_bytecode_file, load_bytecode, save_bytecode, get_source_hash, get_cache_path
+
+# Check structure of whole program in one pass before execution: unique nonzero order values and unique labels
+# Arguments of every instruction are checked by its schema when it is loaded
+# Errors are reported in same priority as before, order values first and labels after them
+def validate_program(instructions:List[Instruction]):
+  used_order_values = set()
+  used_labels = set()
+  label_error:Optional[str] = None
+
+  for instruction in instructions:
+    if instruction.order == 0:
+      handle_error(ErrorCodes.XML_BAD_STRUCTURE, f"Instruction '{instruction.instruction}' with zero order")
+    if instruction.order in used_order_values:
+      handle_error(ErrorCodes.XML_BAD_STRUCTURE, f"Instruction '{instruction.instruction}' with duplicit order {instruction.order}")
+    used_order_values.add(instruction.order)
+
+    if instruction.instruction == InstructionKey.LABEL:
+      label = instruction.arguments[0].value
+      if label in used_labels and label_error is None:
+        label_error = f"Label '{label}' is already defined"
+      used_labels.add(label)
+
+  if label_error is not None:
+    handle_error(ErrorCodes.SEMANTIC_ERROR, label_error)
+
+# Load instructions from XML source incrementally, every instruction element is freed right after conversion
+# First error of program structure is reported only after whole source is read, so badly formed XML is always reported first
+def load_instructions(source:Union[str, BinaryIO], source_description:str="source file") -> List[Instruction]:
+  instructions:List[Instruction] = []
+  structure_error:Optional[InterpreterError] = None
+
+  root = None
+  depth = 0
+
+  try:
+    for event, element in XML.iterparse(source, events=("start", "end")):
+      if event == "start":
+        depth += 1
+        if depth == 1:
+          root = element
+      else:
+        depth -= 1
+
+      if structure_error is None:
+        try:
+          check_element(event, element, depth, instructions)
+        except InterpreterError as error:
+          structure_error = error
+
+      # Drop already processed elements
+      if event == "end" and depth == 1:
+        root.clear()
+  except XML.ParseError:
+    handle_error(ErrorCodes.XML_INPUT_FORMAT, f"Bad format of {source_description}")
+
+  if structure_error is not None:
+    raise structure_error
+  return instructions
+
+# Check structure of element from XML source, instruction is created when its element is read completely
+def check_element(event:str, element:XML.Element, depth:int, instructions:List[Instruction]):
+  if event == "start":
+    if depth == 1:
+      # Check program header
+      if element.tag != "program" or not "language" in element.keys() or element.attrib["language"] != "IPPcode22":
+        handle_error(ErrorCodes.XML_BAD_STRUCTURE, "Missing program header")
+    elif depth == 2:
+      if element.tag not in ("instruction", "name", "description"):
+        handle_error(ErrorCodes.XML_BAD_STRUCTURE, f"Unexpected structure '{element.tag}' in program body")
+  elif depth == 1 and element.tag == "instruction":
+    # Create new instruction from element data
+    instructions.append(Instruction.from_element(element))
+
+# Load validated instructions sorted by order from XML source
+def parse_program(source:Union[str, BinaryIO], source_description:str="source file") -> List[Instruction]:
+  instructions = load_instructions(source, source_description)
+  if not instructions:
+    return instructions
+
+  validate_program(instructions)
+
+  # Sort instructions by order value
+  instructions.sort(key=lambda x: x.order)
+  return instructions
+
+# Load program from XML source or bytecode file, when cache directory is set bytecode of parsed source is reused by next runs
+def load_program(source:Union[str, BinaryIO], source_description:str="source file", cache_dir:Optional[str]=None) -> List[Instruction]:
+  if isinstance(source, str) and is_bytecode_file(source):
+    instructions = load_bytecode(source)
+    if instructions is None:
+      handle_error(ErrorCodes.XML_INPUT_FORMAT, f"Bad format of bytecode in {source_description}")
+    return instructions
+
+  if not cache_dir:
+    return parse_program(source, source_description)
+
+  # Stream can be read only once so keep its data for parsing
+  if not isinstance(source, str):
+    source = io.BytesIO(source.read())
+    cache_path = get_cache_path(cache_dir, get_source_hash(source.getvalue()))
+  else:
+    cache_path = get_cache_path(cache_dir, get_source_hash(source))
+
+  if os.path.isfile(cache_path):
+    instructions = load_bytecode(cache_path)
+    if instructions is not None:
+      return instructions
+
+  instructions = parse_program(source, source_description)
+
+  # Failing cache is not reason to stop interpretation
+  try:
+    os.makedirs(cache_dir, exist_ok=True)
+    save_bytecode(instructions, cache_path)
+  except OSError:
+    pass
+
+  return instructions
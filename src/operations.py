@@ -1,8 +1,9 @@
-from typing import List, Optional
+import operator
+from typing import Any, Callable, Dict, Tuple
 
 from errors import ErrorCodes, handle_error
-from interpreter_objects import Argument, Frame, InstructionKey, ArgumentTypeKey, ArgumentTypeToVariableType, VariableTypeKey, Variable
-from helpers import get_value_from_frames, set_value_in_frames, is_numerical, InputFile
+from interpreter_objects import InstructionKey, VariableTypeKey
+from helpers import is_numerical, InputFile
 
 # perform binary operation on 2 values
 def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1: VariableTypeKey, src_val2, src_val_type2: VariableTypeKey):
@@ -13,6 +14,7 @@ def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1:
     if src_val_type1 != src_val_type2:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} need operands of same type")
 
+    result_type = src_val_type1
     src_val = src_val1 + src_val2
   elif operation in (InstructionKey.SUB, InstructionKey.SUBS):
     if not (is_numerical(src_val_type1) and is_numerical(src_val_type2)):
@@ -21,6 +23,7 @@ def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1:
     if src_val_type1 != src_val_type2:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} need operands of same type")
 
+    result_type = src_val_type1
     src_val = src_val1 - src_val2
   elif operation in (InstructionKey.MUL, InstructionKey.MULS):
     if not (is_numerical(src_val_type1) and is_numerical(src_val_type2)):
@@ -29,6 +32,7 @@ def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1:
     if src_val_type1 != src_val_type2:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} need operands of same type")
 
+    result_type = src_val_type1
     src_val = src_val1 * src_val2
   elif operation in (InstructionKey.DIV, InstructionKey.DIVS):
     if not (is_numerical(src_val_type1) and is_numerical(src_val_type2)):
@@ -39,6 +43,7 @@ def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1:
 
     if src_val2 == 0:
       handle_error(ErrorCodes.BAD_OPERAND_VALUE, "Division by 0 is prohibited")
+    result_type = VariableTypeKey.FLOAT
     src_val = src_val1 / src_val2
   elif operation in (InstructionKey.IDIV, InstructionKey.IDIVS):
     if not (is_numerical(src_val_type1) and is_numerical(src_val_type2)):
@@ -49,6 +54,7 @@ def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1:
 
     if src_val2 == 0:
       handle_error(ErrorCodes.BAD_OPERAND_VALUE, "Division by 0 is prohibited")
+    result_type = VariableTypeKey.INT
     src_val = int(src_val1 // src_val2)
   elif operation in (InstructionKey.LT, InstructionKey.LTS):
     if src_val_type1 == VariableTypeKey.NIL or src_val_type2 == VariableTypeKey.NIL:
@@ -57,6 +63,7 @@ def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1:
     if src_val_type1 != src_val_type2:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} can't be perform on operands with different types")
 
+    result_type = VariableTypeKey.BOOL
     src_val = src_val1 < src_val2
   elif operation in (InstructionKey.GT, InstructionKey.GTS):
     if src_val_type1 == VariableTypeKey.NIL or src_val_type2 == VariableTypeKey.NIL:
@@ -65,22 +72,26 @@ def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1:
     if src_val_type1 != src_val_type2:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} can't be perform on operands with different types")
 
+    result_type = VariableTypeKey.BOOL
     src_val = src_val1 > src_val2
   elif operation in (InstructionKey.EQ, InstructionKey.EQS):
     if src_val_type1 != VariableTypeKey.NIL and src_val_type2 != VariableTypeKey.NIL:
       if src_val_type1 != src_val_type2:
         handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} can't be perform on operands with different types withou one being nil")
 
+    result_type = VariableTypeKey.BOOL
     src_val = src_val1 == src_val2
   elif operation in (InstructionKey.AND, InstructionKey.ANDS):
     if src_val_type1 != VariableTypeKey.BOOL or src_val_type2 != VariableTypeKey.BOOL:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} operation can be performed only on bool operands")
 
+    result_type = VariableTypeKey.BOOL
     src_val = src_val1 and src_val2
   elif operation in (InstructionKey.OR, InstructionKey.ORS):
     if src_val_type1 != VariableTypeKey.BOOL or src_val_type2 != VariableTypeKey.BOOL:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} operation can be performed only on bool operands")
 
+    result_type = VariableTypeKey.BOOL
     src_val = src_val1 or src_val2
   elif operation in (InstructionKey.STRI2INT, InstructionKey.STRI2INTS):
     if src_val_type1 != VariableTypeKey.STRING:
@@ -92,11 +103,13 @@ def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1:
     if 0 > src_val2 or src_val2 >= len(src_val1):
       handle_error(ErrorCodes.BAD_STRING_OPERATION, f"{operation.name} invalid character index")
 
+    result_type = VariableTypeKey.INT
     src_val = ord(src_val1[src_val2])
   elif operation == InstructionKey.CONCAT:
     if src_val_type1 != VariableTypeKey.STRING or src_val_type2 != VariableTypeKey.STRING:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, "Operands for operation CONCAT must be string")
 
+    result_type = VariableTypeKey.STRING
     src_val = src_val1 + src_val2
   elif operation == InstructionKey.GETCHAR:
     if src_val_type1 != VariableTypeKey.STRING:
@@ -105,112 +118,115 @@ def perform_binary_operation(operation: InstructionKey, src_val1, src_val_type1:
     if src_val_type2 != VariableTypeKey.INT:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, "Second operand for operation GETCHAR must be int")
 
-    try:
-      length_of_string = len(src_val1)
-
-      if 0 > int(src_val2) >= length_of_string:
-        handle_error(ErrorCodes.BAD_STRING_OPERATION, "Char index is invalid")
+    if 0 > src_val2 or src_val2 >= len(src_val1):
+      handle_error(ErrorCodes.BAD_STRING_OPERATION, "Char index is invalid")
 
-      src_val = src_val1[int(src_val2)]
-    except:
-      handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"Failed to get char on position {src_val2} in string '{src_val1}'")
-      raise
+    result_type = VariableTypeKey.STRING
+    src_val = src_val1[src_val2]
   else:
     handle_error(ErrorCodes.INTERN, "Unknown binary operation")
     raise
 
-  return src_val
-
-def stack_binary_operation(operation:InstructionKey, data_stack:list):
-  arg2 = Variable("arg2")
-  arg2.set_value(data_stack.pop())
-  arg1 = Variable("arg1")
-  arg1.set_value(data_stack.pop())
-
-  arg1_type, arg1_val = arg1.get_value()
-  arg2_type, arg2_val = arg2.get_value()
-
-  src_val = perform_binary_operation(operation, arg1_val, arg1_type, arg2_val, arg2_type)
-  data_stack.append(src_val)
-
-def binary_operation(operation:InstructionKey, argument1:Argument, argument2:Argument, argument3:Argument, global_frame:Frame, local_frame_stack:List[Frame], temporary_frame:Optional[Frame]):
-  # Load first operand
-  if argument2.type == ArgumentTypeKey.VAR:
-    frame_type, label = argument2.value
-    src_val_type1, src_val1 = get_value_from_frames(frame_type, label, global_frame, local_frame_stack, temporary_frame)
-    if src_val_type1 is None:
-      handle_error(ErrorCodes.MISSING_VALUE, f"First operand of {operation} is uninitialized variable")
-  elif argument2.type not in (ArgumentTypeKey.LABEL, ArgumentTypeKey.TYPE):
-    src_val1 = argument2.value
-    try:
-      src_val_type1 = ArgumentTypeToVariableType[argument2.type]
-    except:
-      handle_error(ErrorCodes.BAD_OPERAND_TYPE, "Invalid argument type for binary operation")
-      raise
-  else:
-    handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{argument2.type} as argument for binary operation")
-    raise
-
-  # Load second operand
-  if argument3.type == ArgumentTypeKey.VAR:
-    frame_type, label = argument3.value
-    src_val_type2, src_val2 = get_value_from_frames(frame_type, label, global_frame, local_frame_stack, temporary_frame)
-    if src_val_type2 is None:
-      handle_error(ErrorCodes.MISSING_VALUE, f"Second operand of {operation} is uninitialized variable")
-  elif argument3.type not in (ArgumentTypeKey.LABEL, ArgumentTypeKey.TYPE):
-    src_val2 = argument3.value
-    try:
-      src_val_type2 = ArgumentTypeToVariableType[argument3.type]
-    except:
-      handle_error(ErrorCodes.BAD_OPERAND_TYPE, "Invalid argument type for binary operation")
-      raise
-  else:
-    handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{argument3.type} as argument for binary operation")
-    raise
-
-  # Perform operation
-  if operation == InstructionKey.SETCHAR:
-    frame_type, label = argument1.value
-    input_value_type, input_value = get_value_from_frames(frame_type, label, global_frame, local_frame_stack, temporary_frame)
+  return result_type, src_val
 
-    if input_value_type != VariableTypeKey.STRING:
-      handle_error(ErrorCodes.BAD_OPERAND_TYPE, "Input value for SETCHAR must be string")
+BinaryOperationKernel = Callable[[Any, Any], Tuple[VariableTypeKey, Any]]
 
-    if src_val_type1 != VariableTypeKey.INT:
-      handle_error(ErrorCodes.BAD_OPERAND_TYPE, "First operand for operation SETCHAR must be int")
+def create_kernel(result_type:VariableTypeKey, function:Callable[[Any, Any], Any]) -> BinaryOperationKernel:
+  def kernel(src_val1, src_val2):
+    return result_type, function(src_val1, src_val2)
+  return kernel
 
-    if src_val_type2 != VariableTypeKey.STRING:
-      handle_error(ErrorCodes.BAD_OPERAND_TYPE, "Second operand for operation SETCHAR must be string")
-
-    try:
-      if len(src_val2) == 0:
-        handle_error(ErrorCodes.BAD_STRING_OPERATION, "String with replace character is empty")
+def create_division_kernel(result_type:VariableTypeKey, function:Callable[[Any, Any], Any]) -> BinaryOperationKernel:
+  def kernel(src_val1, src_val2):
+    if src_val2 == 0:
+      handle_error(ErrorCodes.BAD_OPERAND_VALUE, "Division by 0 is prohibited")
+    return result_type, function(src_val1, src_val2)
+  return kernel
+
+def stri2int_kernel(src_val1, src_val2):
+  if 0 > src_val2 or src_val2 >= len(src_val1):
+    handle_error(ErrorCodes.BAD_STRING_OPERATION, "STRI2INT invalid character index")
+  return VariableTypeKey.INT, ord(src_val1[src_val2])
+
+def getchar_kernel(src_val1, src_val2):
+  if 0 > src_val2 or src_val2 >= len(src_val1):
+    handle_error(ErrorCodes.BAD_STRING_OPERATION, "Char index is invalid")
+  return VariableTypeKey.STRING, src_val1[src_val2]
+
+# Kernels of binary operations for every valid combination of (operation, type of first operand, type of second operand)
+# Combinations missing in this table are passed to perform_binary_operation which reports the operand error
+BINARY_OPERATION_KERNELS:Dict[Tuple[InstructionKey, VariableTypeKey, VariableTypeKey], BinaryOperationKernel] = {}
+
+def register_kernel(operations:Tuple[InstructionKey, ...], src_val_type1:VariableTypeKey, src_val_type2:VariableTypeKey, kernel:BinaryOperationKernel):
+  for operation in operations:
+    BINARY_OPERATION_KERNELS[(operation, src_val_type1, src_val_type2)] = kernel
+
+for numerical_type in (VariableTypeKey.INT, VariableTypeKey.FLOAT):
+  register_kernel((InstructionKey.ADD, InstructionKey.ADDS), numerical_type, numerical_type, create_kernel(numerical_type, operator.add))
+  register_kernel((InstructionKey.SUB, InstructionKey.SUBS), numerical_type, numerical_type, create_kernel(numerical_type, operator.sub))
+  register_kernel((InstructionKey.MUL, InstructionKey.MULS), numerical_type, numerical_type, create_kernel(numerical_type, operator.mul))
+  register_kernel((InstructionKey.DIV, InstructionKey.DIVS), numerical_type, numerical_type, create_division_kernel(VariableTypeKey.FLOAT, operator.truediv))
+  register_kernel((InstructionKey.IDIV, InstructionKey.IDIVS), numerical_type, numerical_type, create_division_kernel(VariableTypeKey.INT, lambda x, y: int(x // y)))
+
+for value_type in VariableTypeKey:
+  if value_type != VariableTypeKey.NIL:
+    register_kernel((InstructionKey.LT, InstructionKey.LTS), value_type, value_type, create_kernel(VariableTypeKey.BOOL, operator.lt))
+    register_kernel((InstructionKey.GT, InstructionKey.GTS), value_type, value_type, create_kernel(VariableTypeKey.BOOL, operator.gt))
+
+  # Nil can be compared with value of any type
+  register_kernel((InstructionKey.EQ, InstructionKey.EQS), value_type, value_type, create_kernel(VariableTypeKey.BOOL, operator.eq))
+  register_kernel((InstructionKey.EQ, InstructionKey.EQS), value_type, VariableTypeKey.NIL, create_kernel(VariableTypeKey.BOOL, operator.eq))
+  register_kernel((InstructionKey.EQ, InstructionKey.EQS), VariableTypeKey.NIL, value_type, create_kernel(VariableTypeKey.BOOL, operator.eq))
+
+register_kernel((InstructionKey.AND, InstructionKey.ANDS), VariableTypeKey.BOOL, VariableTypeKey.BOOL, create_kernel(VariableTypeKey.BOOL, lambda x, y: x and y))
+register_kernel((InstructionKey.OR, InstructionKey.ORS), VariableTypeKey.BOOL, VariableTypeKey.BOOL, create_kernel(VariableTypeKey.BOOL, lambda x, y: x or y))
+register_kernel((InstructionKey.STRI2INT, InstructionKey.STRI2INTS), VariableTypeKey.STRING, VariableTypeKey.INT, stri2int_kernel)
+register_kernel((InstructionKey.CONCAT,), VariableTypeKey.STRING, VariableTypeKey.STRING, create_kernel(VariableTypeKey.STRING, operator.add))
+register_kernel((InstructionKey.GETCHAR,), VariableTypeKey.STRING, VariableTypeKey.INT, getchar_kernel)
+
+# Kernels of one operation keyed only by operand types, resolved once when instruction is compiled
+def get_binary_operation_kernels(operation:InstructionKey) -> Dict[Tuple[VariableTypeKey, VariableTypeKey], BinaryOperationKernel]:
+  return {(src_val_type1, src_val_type2): kernel
+          for (kernel_operation, src_val_type1, src_val_type2), kernel in BINARY_OPERATION_KERNELS.items()
+          if kernel_operation == operation}
+
+# Perform binary operation on two values from top of data stack (stored as parallel lists of types and values)
+def stack_binary_operation(operation:InstructionKey, kernels:Dict[Tuple[VariableTypeKey, VariableTypeKey], BinaryOperationKernel],
+                           data_stack_types:list, data_stack_values:list):
+  arg2_type = data_stack_types.pop()
+  arg2_val = data_stack_values.pop()
+
+  # Result replaces first operand
+  kernel = kernels.get((data_stack_types[-1], arg2_type))
+  if kernel is None:
+    data_stack_types[-1], data_stack_values[-1] = perform_binary_operation(operation, data_stack_values[-1], data_stack_types[-1], arg2_val, arg2_type)
+  else:
+    data_stack_types[-1], data_stack_values[-1] = kernel(data_stack_values[-1], arg2_val)
 
-      length_of_input = len(input_value)
+# Check that character of input string on given position can be replaced by first character of other string
+# Input value is string or string buffer of variable, replacement itself is done in place by caller
+def check_setchar_operands(input_value, input_value_type: VariableTypeKey, src_val1, src_val_type1: VariableTypeKey, src_val2, src_val_type2: VariableTypeKey):
+  if input_value_type != VariableTypeKey.STRING:
+    handle_error(ErrorCodes.BAD_OPERAND_TYPE, "Input value for SETCHAR must be string")
 
-      if 0 > int(src_val1) >= length_of_input:
-        handle_error(ErrorCodes.BAD_STRING_OPERATION, "Char index is invalid")
+  if src_val_type1 != VariableTypeKey.INT:
+    handle_error(ErrorCodes.BAD_OPERAND_TYPE, "First operand for operation SETCHAR must be int")
 
-      input_value[int(src_val1)] = src_val2[0]
-      src_val = input_value
-    except:
-      handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"Failed to set char on position {src_val1} in string '{input_value}' by first character of '{src_val2}'")
-      raise
-  else:
-    src_val = perform_binary_operation(operation, src_val1, src_val_type1, src_val2, src_val_type2)
+  if src_val_type2 != VariableTypeKey.STRING:
+    handle_error(ErrorCodes.BAD_OPERAND_TYPE, "Second operand for operation SETCHAR must be string")
 
-  # Set destination variable
-  if argument1.type != ArgumentTypeKey.VAR:
-    handle_error(ErrorCodes.INTERN, f"Destination for instruction {operation} must be type VAR")
+  if len(src_val2) == 0:
+    handle_error(ErrorCodes.BAD_STRING_OPERATION, "String with replace character is empty")
 
-  frame_type, label = argument1.value
-  set_value_in_frames(frame_type, label, src_val, global_frame, local_frame_stack, temporary_frame)
+  if 0 > src_val1 or src_val1 >= len(input_value):
+    handle_error(ErrorCodes.BAD_STRING_OPERATION, "Char index is invalid")
 
 # Perform unary operaion on value
 def perform_unary_operation(operation: InstructionKey, src_val, src_val_type: VariableTypeKey):
   if operation in (InstructionKey.NOT, InstructionKey.NOTS):
     if src_val_type != VariableTypeKey.BOOL:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} operation can be performed only on bool operand")
+    src_val_type = VariableTypeKey.BOOL
     src_val = not src_val
   elif operation in (InstructionKey.INT2CHAR, InstructionKey.INT2CHARS):
     if src_val_type != VariableTypeKey.INT:
@@ -219,12 +235,14 @@ def perform_unary_operation(operation: InstructionKey, src_val, src_val_type: Va
     if not (0 <= src_val <= 0x10ffff):
       handle_error(ErrorCodes.BAD_STRING_OPERATION, f"Invalid value for {operation.name} operation")
 
+    src_val_type = VariableTypeKey.STRING
     src_val = chr(src_val)
   elif operation in (InstructionKey.INT2FLOAT, InstructionKey.INT2FLOATS):
     if src_val_type != VariableTypeKey.INT:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} operation can be performed only on int operand")
 
     try:
+      src_val_type = VariableTypeKey.FLOAT
       src_val = float(src_val)
     except:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"Failed to convert value {src_val} to float")
@@ -233,6 +251,7 @@ def perform_unary_operation(operation: InstructionKey, src_val, src_val_type: Va
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{operation.name} operation can be performed only on float operand")
 
     try:
+      src_val_type = VariableTypeKey.INT
       src_val = int(src_val)
     except:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"Failed to convert value {src_val} to int")
@@ -241,83 +260,54 @@ def perform_unary_operation(operation: InstructionKey, src_val, src_val_type: Va
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, "STRLEN operation can be performed only on string operand")
 
     try:
+      src_val_type = VariableTypeKey.INT
       src_val = len(src_val)
     except:
       handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"Failed to get length of value {src_val}")
   elif operation == InstructionKey.TYPE:
     if src_val_type is None:
+      src_val_type = VariableTypeKey.STRING
       src_val = ""
     else:
       try:
         src_val = src_val_type.name.lower()
+        src_val_type = VariableTypeKey.STRING
       except:
         handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"Invalid type '{src_val_type}' in TYPE operation")
   else:
     handle_error(ErrorCodes.INTERN, "Unknown unary operation")
 
-  return src_val
-
-def stack_unary_operation(operation:InstructionKey, data_stack:list):
-  arg = Variable("arg")
-  arg.set_value(data_stack.pop())
-
-  arg_type, arg_val = arg.get_value()
-
-  src_val = perform_unary_operation(operation, arg_val, arg_type)
-  data_stack.append(src_val)
-
-def unary_operation(operation:InstructionKey, argument1:Argument, argument2:Argument, global_frame:Frame, local_frame_stack:List[Frame], temporary_frame:Frame):
-  # Load operand
-  if argument2.type == ArgumentTypeKey.VAR:
-    frame_type, label = argument2.value
-    src_val_type, src_val = get_value_from_frames(frame_type, label, global_frame, local_frame_stack, temporary_frame)
-    if src_val_type is None and operation is not InstructionKey.TYPE:
-      handle_error(ErrorCodes.MISSING_VALUE, f"Operand of {operation} is uninitialized variable")
-  elif argument2.type not in (ArgumentTypeKey.LABEL, ArgumentTypeKey.TYPE):
-    src_val = argument2.value
-    try:
-      src_val_type = ArgumentTypeToVariableType[argument2.type]
-    except:
-      handle_error(ErrorCodes.BAD_OPERAND_TYPE, "Invalid argument type for unary operation")
-      raise
-  else:
-    handle_error(ErrorCodes.BAD_OPERAND_TYPE, f"{argument2.type} as argument for unary operation")
-    raise
-
-  # Perform operation
-  src_val = perform_unary_operation(operation, src_val, src_val_type)
-
-  # Set destination variable
-  if argument1.type != ArgumentTypeKey.VAR:
-    handle_error(ErrorCodes.INTERN, f"Destination for instruction {operation} must be type VAR")
+  return src_val_type, src_val
 
-  frame_type, label = argument1.value
-  set_value_in_frames(frame_type, label, src_val, global_frame, local_frame_stack, temporary_frame)
+# Perform unary operation on value on top of data stack, result replaces it
+def stack_unary_operation(operation:InstructionKey, data_stack_types:list, data_stack_values:list):
+  data_stack_types[-1], data_stack_values[-1] = perform_unary_operation(operation, data_stack_values[-1], data_stack_types[-1])
 
+# Read line from input and convert it to target type, nil is returned when input is missing or invalid
 def handle_read_operation(input_file: InputFile, target_type: VariableTypeKey):
   input_value = input_file.get_line()
 
-  if input_value is None: return None
-  if target_type == VariableTypeKey.NIL: return None
+  if input_value is None: return VariableTypeKey.NIL, None
+  if target_type == VariableTypeKey.NIL: return VariableTypeKey.NIL, None
 
   if target_type == VariableTypeKey.BOOL:
     input_value = input_value.lower()
     if input_value == "true":
-      return True
+      return VariableTypeKey.BOOL, True
     else:
-      return False
+      return VariableTypeKey.BOOL, False
   elif target_type == VariableTypeKey.INT:
     try:
-      return int(input_value)
+      return VariableTypeKey.INT, int(input_value)
     except:
-      return None
+      return VariableTypeKey.NIL, None
   elif target_type == VariableTypeKey.FLOAT:
     try:
-      return float(input_value)
+      return VariableTypeKey.FLOAT, float(input_value)
     except:
-      return None
+      return VariableTypeKey.NIL, None
   elif target_type == VariableTypeKey.STRING:
-    return input_value
+    return VariableTypeKey.STRING, input_value
   else:
     handle_error(ErrorCodes.INTERN, f"Invalid type '{target_type}' for READ instruction")
     raise
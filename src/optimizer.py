@@ -0,0 +1,234 @@
+from typing import List, Optional, Tuple
+
+from interpreter_objects import Instruction, InstructionKey, Argument, ArgumentTypeKey, ArgumentTypeToVariableType, VariableTypeKey, \
+  SUPERINSTRUCTION_COMPARISONS, VAR_ARGUMENT, SYMBOL_ARGUMENT, LABEL_ARGUMENT
+
+CONSTANT_ARGUMENT_TYPES = (ArgumentTypeKey.INT, ArgumentTypeKey.FLOAT, ArgumentTypeKey.BOOL,
+                           ArgumentTypeKey.STRING, ArgumentTypeKey.NIL)
+
+# Stack operations which are replaced by their variant with explicit operands when operands are pushed right before them and result is popped right after them
+STACK_BINARY_OPERATIONS = {
+  InstructionKey.ADDS: InstructionKey.ADD,
+  InstructionKey.SUBS: InstructionKey.SUB,
+  InstructionKey.MULS: InstructionKey.MUL,
+  InstructionKey.DIVS: InstructionKey.DIV,
+  InstructionKey.IDIVS: InstructionKey.IDIV,
+  InstructionKey.LTS: InstructionKey.LT,
+  InstructionKey.GTS: InstructionKey.GT,
+  InstructionKey.EQS: InstructionKey.EQ,
+  InstructionKey.ANDS: InstructionKey.AND,
+  InstructionKey.ORS: InstructionKey.OR,
+  InstructionKey.STRI2INTS: InstructionKey.STRI2INT
+}
+
+STACK_UNARY_OPERATIONS = {
+  InstructionKey.NOTS: InstructionKey.NOT,
+  InstructionKey.INT2CHARS: InstructionKey.INT2CHAR,
+  InstructionKey.INT2FLOATS: InstructionKey.INT2FLOAT,
+  InstructionKey.FLOAT2INTS: InstructionKey.FLOAT2INT
+}
+
+# Instructions after which execution doesn't always continue by next instruction or which are targets of jumps
+CONTROL_FLOW_INSTRUCTIONS = (InstructionKey.LABEL, InstructionKey.CALL, InstructionKey.RETURN, InstructionKey.EXIT,
+                             InstructionKey.JUMP, InstructionKey.JUMPIFEQ, InstructionKey.JUMPIFNEQ,
+                             InstructionKey.JUMPIFEQS, InstructionKey.JUMPIFNEQS,
+                             InstructionKey.LTJUMP, InstructionKey.GTJUMP, InstructionKey.EQJUMP)
+
+# Instructions storing value to variable in first argument, after them this variable surely exists and is initialized
+STORING_INSTRUCTIONS = (InstructionKey.MOVE, InstructionKey.POPS,
+                        InstructionKey.ADD, InstructionKey.SUB, InstructionKey.MUL, InstructionKey.DIV, InstructionKey.IDIV,
+                        InstructionKey.LT, InstructionKey.GT, InstructionKey.EQ, InstructionKey.AND, InstructionKey.OR,
+                        InstructionKey.NOT, InstructionKey.INT2CHAR, InstructionKey.STRI2INT, InstructionKey.INT2FLOAT,
+                        InstructionKey.FLOAT2INT, InstructionKey.READ, InstructionKey.CONCAT, InstructionKey.STRLEN,
+                        InstructionKey.GETCHAR, InstructionKey.SETCHAR, InstructionKey.TYPE)
+
+def has_arguments(instruction:Instruction, *argument_types:Tuple[ArgumentTypeKey, ...]) -> bool:
+  if len(instruction.arguments) != len(argument_types):
+    return False
+  return all(argument.type in allowed_types for argument, allowed_types in zip(instruction.arguments, argument_types))
+
+def copy_argument(argument:Argument, idx:int) -> Argument:
+  return Argument.from_value(argument.type, argument.value, idx)
+
+# Replace sequence PUSHS, [PUSHS], stack operation, POPS (or just PUSHS, POPS) by one instruction with explicit operands
+# Returns new instruction and number of replaced instructions
+def fuse_stack_operation(instructions:List[Instruction], index:int) -> Optional[Tuple[Instruction, int]]:
+  pushed_arguments = []
+  position = index
+  while position < len(instructions) and len(pushed_arguments) < 2:
+    instruction = instructions[position]
+    if instruction.instruction != InstructionKey.PUSHS or not has_arguments(instruction, SYMBOL_ARGUMENT):
+      break
+    pushed_arguments.append(instruction.arguments[0])
+    position += 1
+
+  if not pushed_arguments or position >= len(instructions):
+    return None
+
+  operation = instructions[position]
+  if operation.instruction in STACK_BINARY_OPERATIONS and len(pushed_arguments) == 2 and not operation.arguments:
+    fused_operation = STACK_BINARY_OPERATIONS[operation.instruction]
+    position += 1
+  elif operation.instruction in STACK_UNARY_OPERATIONS and not operation.arguments:
+    # Only last pushed value is operand of unary operation
+    pushed_arguments = pushed_arguments[-1:]
+    fused_operation = STACK_UNARY_OPERATIONS[operation.instruction]
+    position += 1
+  elif operation.instruction == InstructionKey.POPS:
+    pushed_arguments = pushed_arguments[-1:]
+    fused_operation = InstructionKey.MOVE
+  else:
+    return None
+
+  if position >= len(instructions):
+    return None
+
+  pops = instructions[position]
+  if pops.instruction != InstructionKey.POPS or not has_arguments(pops, (ArgumentTypeKey.VAR,)):
+    return None
+
+  # Sequence with unary operation or MOVE can start with pushed value which isn't part of it
+  first_index = position - len(pushed_arguments) - (0 if fused_operation == InstructionKey.MOVE else 1)
+  if first_index != index:
+    return None
+
+  arguments = [copy_argument(pops.arguments[0], 1)] + [copy_argument(argument, idx) for idx, argument in enumerate(pushed_arguments, 2)]
+  return Instruction(fused_operation, instructions[index].order, arguments), position + 1 - index
+
+# Decide conditional jump with two constant operands, returns JUMP when it is always taken, None when it is never taken
+# and original instruction when it must be kept (result of invalid comparison is error reported at runtime)
+def evaluate_constant_jump(instruction:Instruction, labels:set) -> Optional[Instruction]:
+  if instruction.instruction not in (InstructionKey.JUMPIFEQ, InstructionKey.JUMPIFNEQ) or \
+    not has_arguments(instruction, LABEL_ARGUMENT, CONSTANT_ARGUMENT_TYPES, CONSTANT_ARGUMENT_TYPES):
+    return instruction
+
+  # Undefined label must be still reported when program is loaded
+  label, operand1, operand2 = instruction.arguments
+  if label.value not in labels:
+    return instruction
+
+  operand1_type = ArgumentTypeToVariableType[operand1.type]
+  operand2_type = ArgumentTypeToVariableType[operand2.type]
+  if operand1_type != operand2_type and operand1_type != VariableTypeKey.NIL and operand2_type != VariableTypeKey.NIL:
+    return instruction
+
+  if (operand1.value == operand2.value) == (instruction.instruction == InstructionKey.JUMPIFEQ):
+    return Instruction(InstructionKey.JUMP, instruction.order, [copy_argument(label, 1)])
+  return None
+
+# Check if instruction is JUMP to label which directly follows it
+def is_jump_to_next(instructions:List[Instruction], index:int, instruction:Instruction) -> bool:
+  if instruction.instruction != InstructionKey.JUMP or not has_arguments(instruction, LABEL_ARGUMENT):
+    return False
+
+  position = index + 1
+  while position < len(instructions) and instructions[position].instruction == InstructionKey.LABEL:
+    if instructions[position].arguments and instructions[position].arguments[0].value == instruction.arguments[0].value:
+      return True
+    position += 1
+  return False
+
+# Check if instruction is MOVE of variable to itself right after previous instruction stored value to this variable
+def is_redundant_move(instruction:Instruction, previous:Optional[Instruction]) -> bool:
+  if instruction.instruction != InstructionKey.MOVE or not has_arguments(instruction, (ArgumentTypeKey.VAR,), (ArgumentTypeKey.VAR,)):
+    return False
+
+  if instruction.arguments[0].value != instruction.arguments[1].value:
+    return False
+
+  # Otherwise MOVE reports undefined or uninitialized variable
+  return previous is not None and previous.instruction in STORING_INSTRUCTIONS and \
+    bool(previous.arguments) and previous.arguments[0].type == ArgumentTypeKey.VAR and previous.arguments[0].value == instruction.arguments[0].value
+
+# Rewrite sorted instructions by peephole optimizations
+# Returns optimized instructions and for every one of them indexes of source instructions it executes (used by statistics)
+def optimize_instructions(instructions:List[Instruction]) -> Tuple[List[Instruction], List[Tuple[int, ...]]]:
+  labels = {instruction.arguments[0].value for instruction in instructions
+            if instruction.instruction == InstructionKey.LABEL and instruction.arguments}
+
+  optimized_instructions:List[Instruction] = []
+  source_indexes:List[Tuple[int, ...]] = []
+
+  index = 0
+  while index < len(instructions):
+    fused = fuse_stack_operation(instructions, index)
+    if fused is not None:
+      fused_instruction, length = fused
+      optimized_instructions.append(fused_instruction)
+      source_indexes.append(tuple(range(index, index + length)))
+      index += length
+      continue
+
+    previous = optimized_instructions[-1] if optimized_instructions else None
+    instruction = evaluate_constant_jump(instructions[index], labels)
+
+    if instruction is None or is_jump_to_next(instructions, index, instruction) or is_redundant_move(instruction, previous):
+      # Instruction without effect can be dropped only when it is always executed together with previous one
+      if previous is not None and previous.instruction not in CONTROL_FLOW_INSTRUCTIONS:
+        source_indexes[-1] += (index,)
+        index += 1
+        continue
+
+      if instruction is None:
+        instruction = instructions[index]
+
+    optimized_instructions.append(instruction)
+    source_indexes.append((index,))
+    index += 1
+
+  return optimized_instructions, source_indexes
+
+COMPARISON_SUPERINSTRUCTIONS = {comparison: superinstruction for superinstruction, comparison in SUPERINSTRUCTION_COMPARISONS.items()}
+
+# Replace comparison storing result to variable followed by conditional jump testing this variable against bool constant
+# by compare and jump superinstruction with arguments (label, variable, symbol, symbol, result of comparison which leads to jump)
+def fuse_compare_jump(comparison:Instruction, jump:Instruction) -> Optional[Instruction]:
+  if comparison.instruction not in COMPARISON_SUPERINSTRUCTIONS or jump.instruction not in (InstructionKey.JUMPIFEQ, InstructionKey.JUMPIFNEQ):
+    return None
+
+  if not has_arguments(comparison, VAR_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT) or \
+    not has_arguments(jump, LABEL_ARGUMENT, SYMBOL_ARGUMENT, SYMBOL_ARGUMENT):
+    return None
+
+  # Jump has to test stored variable against bool constant, in any order of operands
+  destination = comparison.arguments[0]
+  label, operand1, operand2 = jump.arguments
+  if operand2.type == ArgumentTypeKey.VAR:
+    operand1, operand2 = operand2, operand1
+
+  if operand1.type != ArgumentTypeKey.VAR or operand1.value != destination.value or operand2.type != ArgumentTypeKey.BOOL:
+    return None
+
+  # Stored result is always bool so jump can't fail on types and depends only on result of comparison
+  jump_result = operand2.value if jump.instruction == InstructionKey.JUMPIFEQ else not operand2.value
+
+  arguments = [copy_argument(label, 1), copy_argument(destination, 2), copy_argument(comparison.arguments[1], 3),
+               copy_argument(comparison.arguments[2], 4), Argument.from_value(ArgumentTypeKey.BOOL, jump_result, 5)]
+  return Instruction(COMPARISON_SUPERINSTRUCTIONS[comparison.instruction], comparison.order, arguments)
+
+# Replace common pairs of instructions by superinstructions executed by one dispatch
+# Mapping to source instructions (identity when it is None) is extended by fused pairs
+def fuse_superinstructions(instructions:List[Instruction], source_indexes:Optional[List[Tuple[int, ...]]]=None) \
+  -> Tuple[List[Instruction], List[Tuple[int, ...]]]:
+  if source_indexes is None:
+    source_indexes = [(index,) for index in range(len(instructions))]
+
+  fused_instructions:List[Instruction] = []
+  fused_source_indexes:List[Tuple[int, ...]] = []
+
+  index = 0
+  while index < len(instructions):
+    # Second instruction of pair directly follows comparison (not label or call) so nothing else can jump on it
+    if index + 1 < len(instructions):
+      superinstruction = fuse_compare_jump(instructions[index], instructions[index + 1])
+      if superinstruction is not None:
+        fused_instructions.append(superinstruction)
+        fused_source_indexes.append(source_indexes[index] + source_indexes[index + 1])
+        index += 2
+        continue
+
+    fused_instructions.append(instructions[index])
+    fused_source_indexes.append(source_indexes[index])
+    index += 1
+
+  return fused_instructions, fused_source_indexes
@@ -0,0 +1,246 @@
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple, Callable
+
+from interpreter_objects import Instruction, InstructionKey
+from errors import ErrorCodes, handle_error
+
+PROFILE_FORMATS = ("report", "collapsed")
+PROFILE_SORT_KEYS = ("time", "calls")
+
+# Name of bottom frame in collapsed stacks
+ROOT_FRAME = "main"
+
+# Node of call tree, there is one node for every label called from its parent node (root is main program)
+# Call of label which is already on path from root is folded back to node of that label, so recursion doesn't add nodes
+# Counters of instructions executed directly in node are sparse, most nodes run only few instructions of program
+class CallNode:
+  def __init__(self, label:Optional[str]=None, parent:Optional["CallNode"]=None):
+    self.label = label
+    self.parent = parent
+    self.children:Dict[str, CallNode] = {}
+    # Node entered by call of every label from this node, it is child or folded node on path from root
+    self.callees:Dict[str, CallNode] = {}
+    self.instruction_calls:Dict[int, int] = defaultdict(int)
+    self.instruction_times:Dict[int, int] = defaultdict(int)
+
+  def get_callee(self, label:str) -> "CallNode":
+    callee = self.callees.get(label)
+    if callee is None:
+      callee = self
+      while callee is not None and callee.label != label:
+        callee = callee.parent
+
+      if callee is None:
+        callee = self.children[label] = CallNode(label, self)
+      self.callees[label] = callee
+    return callee
+
+# Costs of all calls of one label, inclusive values contain nested calls and are counted only in outermost call of recursion
+class LabelCosts:
+  def __init__(self):
+    self.calls = 0
+    # Current and maximum number of calls of label in call stack
+    self.depth = 0
+    self.max_depth = 0
+    self.inclusive_instructions = 0
+    self.exclusive_instructions = 0
+    self.inclusive_time = 0
+    self.exclusive_time = 0
+
+# Collects wall time of executed instructions, times are in nanoseconds
+# Profiled program is executed by separate loop so running without profiler isn't slowed down
+class Profiler:
+  def __init__(self, instructions:List[Instruction], profile_path:Optional[str]=None, profile_format:str="report", sort_key:str="time"):
+    self.instructions = instructions
+    self.profile_path = profile_path
+    self.profile_format = profile_format
+    self.sort_key = sort_key
+    self.report:Optional[str] = None
+
+    # Wall time of whole run, it also contains time of profiling between instructions
+    self.start_time = 0
+    self.end_time = 0
+
+    # Label called by every CALL instruction (None for other instructions)
+    self.call_labels:List[Optional[str]] = [instruction.arguments[0].value if instruction.instruction == InstructionKey.CALL else None
+                                            for instruction in instructions]
+
+    # Function called after execution of instruction which changes call stack or frames (None for other instructions)
+    # It gets time when execution of instruction ended and number of instructions executed until then
+    instruction_events = {InstructionKey.CALL: self.enter_call, InstructionKey.RETURN: self.leave_call, InstructionKey.PUSHFRAME: self.update_frame_depth}
+    self.events:List[Optional[Callable]] = [instruction_events.get(instruction.instruction) for instruction in instructions]
+
+    # Node of executed instructions and for every active call node of caller, time and number of instructions at entry
+    self.root = CallNode()
+    self.node = self.root
+    self.call_stack:List[Tuple[CallNode, int, int]] = []
+    self.select_node(self.root)
+
+    # Time and number of instructions at last call or return, everything after it is exclusive cost of label on top of call stack
+    self.last_event_time = 0
+    self.last_event_instructions = 0
+
+    self.label_costs:Dict[str, LabelCosts] = {}
+    # Number of calls between every caller and called label
+    self.call_edges:Dict[Tuple[str, str], int] = defaultdict(int)
+    self.max_call_depth = 0
+    self.max_local_frame_depth = 0
+
+  # Counters of current node are used by profiled loop directly
+  def select_node(self, node:CallNode):
+    self.node = node
+    self.instruction_calls = node.instruction_calls
+    self.instruction_times = node.instruction_times
+
+  def update_exclusive_costs(self, time:int, executed_instructions:int):
+    if self.call_stack:
+      costs = self.label_costs[self.node.label]
+      costs.exclusive_time += time - self.last_event_time
+      costs.exclusive_instructions += executed_instructions - self.last_event_instructions
+
+    self.last_event_time = time
+    self.last_event_instructions = executed_instructions
+
+  def enter_call(self, state, instruction_index:int, time:int, executed_instructions:int):
+    self.update_exclusive_costs(time, executed_instructions)
+
+    label = self.call_labels[instruction_index]
+    costs = self.label_costs.get(label)
+    if costs is None:
+      costs = self.label_costs[label] = LabelCosts()
+    costs.calls += 1
+    costs.depth += 1
+    costs.max_depth = max(costs.max_depth, costs.depth)
+
+    self.call_edges[self.node.label if self.call_stack else ROOT_FRAME, label] += 1
+    self.call_stack.append((self.node, time, executed_instructions))
+    self.max_call_depth = max(self.max_call_depth, len(self.call_stack))
+    self.select_node(self.node.get_callee(label))
+
+  def leave_call(self, state, instruction_index:int, time:int, executed_instructions:int):
+    # RETURN with empty call stack ends program by error
+    if not self.call_stack:
+      return
+
+    self.update_exclusive_costs(time, executed_instructions)
+
+    caller_node, entry_time, entry_instructions = self.call_stack.pop()
+    costs = self.label_costs[self.node.label]
+    costs.depth -= 1
+    if costs.depth == 0:
+      costs.inclusive_time += time - entry_time
+      costs.inclusive_instructions += executed_instructions - entry_instructions
+    self.select_node(caller_node)
+
+  def update_frame_depth(self, state, instruction_index:int, time:int, executed_instructions:int):
+    self.max_local_frame_depth = max(self.max_local_frame_depth, len(state.local_frame_stack))
+
+  def start(self, time:int):
+    self.start_time = time
+    self.last_event_time = time
+
+  # Calls which weren't returned from (program ended by EXIT or error) end with program
+  def finish(self, time:int, executed_instructions:int):
+    self.end_time = time
+    while self.call_stack:
+      self.leave_call(None, None, time, executed_instructions)
+
+  # All nodes of call tree, parents are always before their children
+  def get_nodes(self) -> List[CallNode]:
+    nodes = [self.root]
+    for node in nodes:
+      nodes.extend(node.children.values())
+    return nodes
+
+  def get_total_instruction_counters(self, counters_name:str) -> List[int]:
+    total_counters = [0] * len(self.instructions)
+    for node in self.get_nodes():
+      for index, counter in getattr(node, counters_name).items():
+        total_counters[index] += counter
+    return total_counters
+
+  def get_total_instruction_calls(self) -> List[int]:
+    return self.get_total_instruction_counters("instruction_calls")
+
+  def format_table(self, title:str, header:Tuple[str, ...], rows:List[Tuple], calls_column:int, time_column:int) -> List[str]:
+    rows.sort(key=lambda row: row[time_column if self.sort_key == "time" else calls_column], reverse=True)
+
+    # Times are converted from nanoseconds to milliseconds
+    time_columns = [column.endswith("_ms") for column in header]
+
+    lines = [f"# {title}", "\t".join(header)]
+    for row in rows:
+      lines.append("\t".join(f"{value / 1e6:.3f}" if is_time else str(value) for value, is_time in zip(row, time_columns)))
+    lines.append("")
+    return lines
+
+  # Tab separated tables of instructions by opcode, by order and of called labels
+  def get_report(self) -> str:
+    total_calls = self.get_total_instruction_calls()
+    total_times = self.get_total_instruction_counters("instruction_times")
+    instructions_time = sum(total_times)
+    total_time = self.end_time - self.start_time
+
+    # Instructions are compared to time of instructions, calls of labels to wall time of whole run
+    def percent(value:int, whole:int=instructions_time) -> str:
+      return f"{100 * value / whole:.2f}" if whole else "0.00"
+
+    opcode_totals:Dict[InstructionKey, List[int]] = {}
+    order_rows = []
+    for instruction, calls, instruction_time in zip(self.instructions, total_calls, total_times):
+      if not calls:
+        continue
+
+      opcode_total = opcode_totals.setdefault(instruction.instruction, [0, 0])
+      opcode_total[0] += calls
+      opcode_total[1] += instruction_time
+      order_rows.append((instruction.order, instruction.instruction.name, calls, instruction_time, percent(instruction_time)))
+
+    opcode_rows = [(opcode.name, calls, opcode_time, percent(opcode_time)) for opcode, (calls, opcode_time) in opcode_totals.items()]
+    label_rows = [(label, costs.calls, costs.max_depth, costs.inclusive_instructions, costs.exclusive_instructions,
+                   costs.inclusive_time, costs.exclusive_time, percent(costs.inclusive_time, total_time))
+                  for label, costs in self.label_costs.items()]
+    edge_rows = [(caller, callee, calls) for (caller, callee), calls in self.call_edges.items()]
+
+    lines = [f"# Total time (ms): {total_time / 1e6:.3f}",
+             f"# Time of instructions (ms): {instructions_time / 1e6:.3f}",
+             f"# Maximum call depth: {self.max_call_depth}",
+             f"# Maximum local frame stack depth: {self.max_local_frame_depth}",
+             ""]
+    lines += self.format_table("Instructions by opcode", ("opcode", "calls", "time_ms", "percent"), opcode_rows, 1, 2)
+    lines += self.format_table("Instructions by order", ("order", "opcode", "calls", "time_ms", "percent"), order_rows, 2, 3)
+    lines += self.format_table("Called labels", ("label", "calls", "max_recursion", "inclusive_insts", "exclusive_insts",
+                                                 "inclusive_ms", "exclusive_ms", "percent"), label_rows, 1, 5)
+    lines += self.format_table("Calls between labels", ("caller", "callee", "calls"), edge_rows, 2, 2)
+    return "\n".join(lines)
+
+  # Collapsed stacks for flame graphs, every line is stack of called labels ended by opcode and time in nanoseconds
+  # Recursive calls are folded to the outermost call of label
+  def get_collapsed_stacks(self) -> str:
+    lines = []
+    stacks = {self.root: ROOT_FRAME}
+    for node in self.get_nodes():
+      if node.parent is not None:
+        stacks[node] = f"{stacks[node.parent]};{node.label}"
+
+      opcode_times:Dict[str, int] = {}
+      for index, instruction_time in node.instruction_times.items():
+        opcode_name = self.instructions[index].instruction.name
+        opcode_times[opcode_name] = opcode_times.get(opcode_name, 0) + instruction_time
+
+      for opcode_name, opcode_time in sorted(opcode_times.items()):
+        lines.append(f"{stacks[node]};{opcode_name} {opcode_time}\n")
+
+    lines.sort()
+    return "".join(lines)
+
+  def save(self):
+    self.report = self.get_report() if self.profile_format == "report" else self.get_collapsed_stacks()
+    if self.profile_path is None:
+      return
+
+    try:
+      with open(self.profile_path, "w") as f:
+        f.write(self.report)
+    except:
+      handle_error(ErrorCodes.OUTPUT_FILE, "Failed to open profile output file")
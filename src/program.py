@@ -0,0 +1,115 @@
+from typing import List, Dict, Optional, Tuple, Union, Iterable, BinaryIO, TextIO
+
+from interpreter_objects import Instruction, InstructionKey, ArgumentTypeKey, FrameTypeKey, DEFAULT_MAX_STACK_DEPTH
+from errors import ErrorCodes, InterpreterError, handle_error
+from helpers import InputFile, OutputBuffer
+from execution import ExecutionState, execute_program
+from compiler import CompiledInstruction, compile_program
+from optimizer import optimize_instructions, fuse_superinstructions
+from stats import StatsCollector
+from profiler import Profiler
+from loader import load_program
+
+LABEL_TARGET_INSTRUCTIONS = (InstructionKey.CALL, InstructionKey.JUMP,
+                             InstructionKey.JUMPIFEQ, InstructionKey.JUMPIFNEQ,
+                             InstructionKey.JUMPIFEQS, InstructionKey.JUMPIFNEQS,
+                             InstructionKey.LTJUMP, InstructionKey.GTJUMP, InstructionKey.EQJUMP)
+
+# Map names of labels to indexes of LABEL instructions
+def extract_labels(instructions:List[Instruction]) -> Dict[str, int]:
+  labels = {}
+  for idx, ins in enumerate(instructions):
+    if ins.instruction == InstructionKey.LABEL:
+      label_val = ins.arguments[0].value
+      if label_val in labels.keys():
+        handle_error(ErrorCodes.SEMANTIC_ERROR, f"Label '{label_val}' is already defined")
+
+      labels[label_val] = idx
+  return labels
+
+# Resolve label arguments of jump instructions to indexes of instructions following target labels
+def resolve_label_targets(instructions, labels):
+  for instruction in instructions:
+    if instruction.instruction not in LABEL_TARGET_INSTRUCTIONS:
+      continue
+
+    # Label is always first argument of these instructions
+    label_argument = instruction.arguments[0]
+
+    if label_argument.value not in labels:
+      # Undefined label in CALL was always reported as internal error
+      if instruction.instruction == InstructionKey.CALL:
+        handle_error(ErrorCodes.INTERN, f"Label '{label_argument.value}' is not defined")
+      handle_error(ErrorCodes.SEMANTIC_ERROR, f"Label {label_argument.value} is undefined")
+
+    # Label itself does nothing so execution can continue right after it
+    label_argument.target_index = labels[label_argument.value] + 1
+
+# Assign slot to every variable name used in program, local and temporary frames share slots
+def allocate_variable_slots(instructions):
+  global_slots = {}
+  local_slots = {}
+
+  for instruction in instructions:
+    for argument in instruction.arguments:
+      if argument.type != ArgumentTypeKey.VAR:
+        continue
+
+      frame_type, label = argument.value
+      slots = global_slots if frame_type == FrameTypeKey.GLOBAL else local_slots
+      if label not in slots:
+        slots[label] = len(slots)
+      argument.slot = slots[label]
+
+  return list(global_slots.keys()), list(local_slots.keys())
+
+# Program loaded and validated once, it can be run many times with different inputs
+class Program:
+  def __init__(self, instructions:List[Instruction], optimize:bool=False):
+    # Sorted source instructions, statistics are always collected for them
+    self.source_instructions = instructions
+    self.source_indexes:Optional[List[Tuple[int, ...]]] = None
+
+    if optimize:
+      instructions, self.source_indexes = optimize_instructions(instructions)
+
+    # Pairs of instructions which are frequently executed together are always fused
+    self.instructions, self.source_indexes = fuse_superinstructions(instructions, self.source_indexes)
+
+    self.labels = extract_labels(self.instructions)
+    resolve_label_targets(self.instructions, self.labels)
+
+    self.global_variable_names, self.local_variable_names = allocate_variable_slots(self.instructions)
+
+    # Compile instructions to specialised functions
+    self.code:List[CompiledInstruction] = compile_program(self.instructions)
+
+  # Load program from XML source or bytecode (path or binary stream)
+  @classmethod
+  def load(cls, source:Union[str, BinaryIO], source_description:str="source file", cache_dir:Optional[str]=None, optimize:bool=False):
+    return cls(load_program(source, source_description, cache_dir), optimize)
+
+  # Create collector of statistics for one run of program, without path statistics are only kept in its report
+  def create_stats(self, stats_arguments:List[str], stats_path:Optional[str]=None) -> StatsCollector:
+    return StatsCollector(self.source_instructions, stats_path, stats_arguments, self.source_indexes)
+
+  # Create profiler for one run of program, without path profile is only kept in its report
+  def create_profiler(self, profile_path:Optional[str]=None, profile_format:str="report", sort_key:str="time") -> Profiler:
+    return Profiler(self.instructions, profile_path, profile_format, sort_key)
+
+  # Run program with fresh frames and stacks, returns exit code of program
+  # Input is InputFile or any iterable of lines (without new line characters), output is text stream (standard output by default)
+  # Program which pushes more items to data stack or call stack than maximum depth is stopped by internal error
+  def run(self, input_lines:Union[InputFile, Iterable[str]], stdout:Optional[TextIO]=None, stats:Optional[StatsCollector]=None,
+          profiler:Optional[Profiler]=None, max_stack_depth:int=DEFAULT_MAX_STACK_DEPTH) -> int:
+    input_file = input_lines if isinstance(input_lines, InputFile) else InputFile.from_lines(input_lines)
+    output = OutputBuffer(stdout)
+
+    state = ExecutionState(self.code, self.global_variable_names, self.local_variable_names, input_file, output, stats, profiler,
+                           max_stack_depth)
+    try:
+      return execute_program(state)
+    except InterpreterError:
+      # Output produced before error is still part of result
+      output.flush()
+      raise
@@ -0,0 +1,102 @@
+import io
+import json
+import struct
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from typing import BinaryIO, Optional
+
+from interpreter_objects import DEFAULT_MAX_STACK_DEPTH
+from errors import ErrorCodes, InterpreterError, ERROR_TYPES, report_error
+from helpers import InputFile
+from loader import load_program
+from program import Program
+
+# Every message (request or response) is JSON object in UTF-8 prefixed by its length as 4 byte big endian number
+#   request:  {"source": "<XML source>", "input": "<input data>", "stats": ["--insts", "--hot", "--vars"], "optimize": false}
+#   response: {"stdout": "...", "stderr": "...", "exit_code": 0, "stats": "<content of stats file>"}
+# Only source is required, stats in response are null when statistics weren't requested or program failed
+# Request which isn't JSON object with source gets response with exit code 31, stream truncated inside message ends server
+MESSAGE_LENGTH = struct.Struct(">I")
+
+def read_message(stream:BinaryIO) -> Optional[dict]:
+  header = stream.read(MESSAGE_LENGTH.size)
+  if not header:
+    return None
+
+  if len(header) != MESSAGE_LENGTH.size:
+    raise EOFError("Incomplete message header")
+
+  length, = MESSAGE_LENGTH.unpack(header)
+  data = stream.read(length)
+  if len(data) != length:
+    raise EOFError("Incomplete message data")
+  return json.loads(data.decode("utf-8"))
+
+def write_message(stream:BinaryIO, message:dict):
+  data = json.dumps(message).encode("utf-8")
+  stream.write(MESSAGE_LENGTH.pack(len(data)) + data)
+  stream.flush()
+
+# Response to request which can't be run, error is reported same way as errors of programs
+def create_error_response(error_code:ErrorCodes, message:str) -> dict:
+  stderr = io.StringIO()
+  with redirect_stderr(stderr):
+    exit_code = report_error(ERROR_TYPES[error_code](message))
+
+  return {
+    "stdout": "",
+    "stderr": stderr.getvalue(),
+    "exit_code": exit_code,
+    "stats": None
+  }
+
+# Run one program, everything program writes or reports is captured to response
+def handle_request(request:dict, max_stack_depth:int=DEFAULT_MAX_STACK_DEPTH) -> dict:
+  stdout = io.StringIO()
+  stderr = io.StringIO()
+  stats = None
+  exit_code = 0
+
+  with redirect_stdout(stdout), redirect_stderr(stderr):
+    try:
+      instructions = load_program(io.BytesIO(request["source"].encode("utf-8")), "source data of request")
+      if instructions:
+        program = Program(instructions, request.get("optimize", False))
+        if request.get("stats") is not None:
+          stats = program.create_stats(request["stats"])
+
+        exit_code = program.run(InputFile.from_text(request.get("input")), stdout, stats, max_stack_depth=max_stack_depth)
+    except InterpreterError as error:
+      exit_code = report_error(error)
+    except Exception:
+      traceback.print_exc()
+      exit_code = ErrorCodes.INTERN.value
+
+  return {
+    "stdout": stdout.getvalue(),
+    "stderr": stderr.getvalue(),
+    "exit_code": exit_code,
+    "stats": stats.report if stats is not None else None
+  }
+
+# Serve requests until end of request stream, interpreter stays loaded between programs
+def serve(request_stream:BinaryIO, response_stream:BinaryIO, max_stack_depth:int=DEFAULT_MAX_STACK_DEPTH):
+  while True:
+    try:
+      request = read_message(request_stream)
+    except EOFError:
+      # Client closed stream in the middle of message, there is nobody to respond to
+      return
+    except ValueError:
+      # Whole message was read so next request can still be served
+      write_message(response_stream, create_error_response(ErrorCodes.XML_INPUT_FORMAT, "Request is not valid JSON"))
+      continue
+
+    if request is None:
+      return
+
+    if not isinstance(request, dict) or not isinstance(request.get("source"), str):
+      write_message(response_stream, create_error_response(ErrorCodes.XML_INPUT_FORMAT, "Request must be JSON object with source"))
+      continue
+
+    write_message(response_stream, handle_request(request, max_stack_depth))
@@ -1,58 +1,86 @@
-import sys
+from typing import List, Dict, Optional, Tuple
 
 from interpreter_objects import Instruction, InstructionKey
 from errors import ErrorCodes, handle_error
 
-max_number_of_init_vars = 0
-all_instruction_calls = 0
-instruction_calls = {}
-
-def aggregate_stats(instr: Instruction, number_of_init_variables:int):
-  global all_instruction_calls
-  global max_number_of_init_vars
-
-  if number_of_init_variables > max_number_of_init_vars:
-    max_number_of_init_vars = number_of_init_variables
-
-  if instr.instruction in (InstructionKey.LABEL, InstructionKey.DPRINT, InstructionKey.BREAK):
-    return
-
-  if instr.order not in instruction_calls.keys():
-    instruction_calls[instr.order] = 0
-  else:
-    instruction_calls[instr.order] += 1
-
-  all_instruction_calls += 1
-
-def get_inst_counter():
-  return all_instruction_calls
-
-def save_stats(stats_path:str):
-  args = []
-
-  for arg in sys.argv:
-    if arg in ("--hot", "--insts", "--vars"):
-      args.append(arg)
-
-  # Get instruction order with most calls
-  instr_order_with_max_calls = None
-  max_calls = 0
-  for key in instruction_calls.keys():
-    val = instruction_calls.get(key)
-    if val >= max_calls:
-      if instr_order_with_max_calls is None or instr_order_with_max_calls > key:
-        max_calls = val
-        instr_order_with_max_calls = key
-
-  try:
-    with open(stats_path, "w") as f:
-      for arg in args:
-        if arg == "--insts":
-          f.write(f"{all_instruction_calls}\n")
-        elif arg == "--hot":
-          if instr_order_with_max_calls is not None:
-            f.write(f"{instr_order_with_max_calls}\n")
-        elif arg == "--vars":
-          f.write(f"{max_number_of_init_vars}\n")
-  except:
-    handle_error(ErrorCodes.OUTPUT_FILE, "Failed to open output file")
\ No newline at end of file
+STATS_ARGUMENTS = ("--hot", "--insts", "--vars")
+
+# Instructions that are not counted in statistics
+NOT_COUNTED_INSTRUCTIONS = (InstructionKey.LABEL, InstructionKey.DPRINT, InstructionKey.BREAK)
+
+class StatsCollector:
+  def __init__(self, instructions:List[Instruction], stats_path:Optional[str], stats_arguments:List[str],
+               source_indexes:Optional[List[Tuple[int, ...]]]=None):
+    # Source instructions of program, executed program can differ when it was optimized
+    self.instructions = instructions
+    # Without path statistics are only kept in report
+    self.stats_path = stats_path
+    self.report:Optional[str] = None
+    # Order of statistics in output file follows order of arguments
+    self.stats_arguments = [arg for arg in stats_arguments if arg in STATS_ARGUMENTS]
+
+    # Indexes of source instructions performed by every executed instruction, None when program is executed as is
+    self.source_indexes = source_indexes
+
+    # Number of executions of every instruction indexed by its position in executed program
+    self.instruction_calls = [0] * (len(source_indexes) if source_indexes is not None else len(instructions))
+
+  # Number of executions of every source instruction
+  def get_source_instruction_calls(self) -> List[int]:
+    if self.source_indexes is None:
+      return self.instruction_calls
+
+    source_instruction_calls = [0] * len(self.instructions)
+    for indexes, calls in zip(self.source_indexes, self.instruction_calls):
+      for index in indexes:
+        source_instruction_calls[index] += calls
+    return source_instruction_calls
+
+  def get_inst_counter(self) -> int:
+    return sum(self.get_opcode_calls().values())
+
+  # Number of executions of every counted opcode
+  def get_opcode_calls(self) -> Dict[InstructionKey, int]:
+    opcode_calls = {}
+    for instruction, calls in zip(self.instructions, self.get_source_instruction_calls()):
+      if calls and instruction.instruction not in NOT_COUNTED_INSTRUCTIONS:
+        opcode_calls[instruction.instruction] = opcode_calls.get(instruction.instruction, 0) + calls
+    return opcode_calls
+
+  # Order of instruction with most calls, lowest order wins when there are more of them
+  def get_hot_instruction_order(self) -> Optional[int]:
+    instr_order_with_max_calls = None
+    max_calls = 0
+    for instruction, calls in zip(self.instructions, self.get_source_instruction_calls()):
+      if not calls or instruction.instruction in NOT_COUNTED_INSTRUCTIONS:
+        continue
+
+      if calls > max_calls or (calls == max_calls and instruction.order < instr_order_with_max_calls):
+        max_calls = calls
+        instr_order_with_max_calls = instruction.order
+
+    return instr_order_with_max_calls
+
+  def get_report(self, max_number_of_init_vars:int) -> str:
+    lines = []
+    for arg in self.stats_arguments:
+      if arg == "--insts":
+        lines.append(f"{self.get_inst_counter()}\n")
+      elif arg == "--hot":
+        instr_order_with_max_calls = self.get_hot_instruction_order()
+        if instr_order_with_max_calls is not None:
+          lines.append(f"{instr_order_with_max_calls}\n")
+      elif arg == "--vars":
+        lines.append(f"{max_number_of_init_vars}\n")
+    return "".join(lines)
+
+  def save(self, max_number_of_init_vars:int):
+    self.report = self.get_report(max_number_of_init_vars)
+    if self.stats_path is None:
+      return
+
+    try:
+      with open(self.stats_path, "w") as f:
+        f.write(self.report)
+    except:
+      handle_error(ErrorCodes.OUTPUT_FILE, "Failed to open output file")